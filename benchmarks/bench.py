@@ -0,0 +1,131 @@
+"""Time each stage of the three report pipelines on synthetic inputs.
+
+    python -m benchmarks.bench --rows 1000 10000 100000 --json bench-results.jsonl
+
+For every size the inputs are generated once (see benchmarks.synthetic) and
+cached under --data. Each stage reports its best wall time over --repeat runs,
+throughput in input rows per second and, unless --no-memory is given, the
+peak of Python allocations during one extra traced run.
+"""
+import argparse
+import json
+import subprocess
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import pandas as pd
+
+from benchmarks.synthetic import write_inputs
+from osg_dashboard.all_store_report import build_all_store_workbook, build_report_df, partition_by_rbm
+from osg_dashboard.day_view_report import build_day_view, generate_report2_excel
+from osg_dashboard.ingest import ALL_STORE_SALES, DAY_VIEW_SALES, OSG, PRODUCT, read_upload
+from osg_dashboard.exports import csv_bytes, parquet_available, parquet_bytes
+from osg_dashboard.osg_mapping import map_osg, mapped_report_csv, mapped_report_excel, mapped_report_parquet
+from osg_dashboard.rbm_pdf import build_rbm_pdfs
+from osg_dashboard.store_dimension import StoreDimension
+
+
+def measure(func, repeat, memory):
+    """(result, best seconds, peak MiB or None) of calling `func`."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+
+def pipeline_stages(paths, report_date):
+    """(pipeline, stage, callable) in run order; each callable may use the results before it."""
+    refs = {name: pd.read_excel(paths[name]) for name in ('store_list', 'rbm_bdm', 'future_store')}
+    future_stores = StoreDimension(refs['future_store']['Store'])
+    out = {}
+
+    def all_store_aggregate():
+        report_df = build_report_df(out['sales'].copy(), refs['store_list'], refs['rbm_bdm'], report_date)
+        return report_df, partition_by_rbm(report_df)
+
+    def osg_ingest():
+        return read_upload(paths['osg'], OSG), read_upload(paths['product'], PRODUCT)
+
+    def osg_map():
+        osg_df, product_df = out['osg']
+        return map_osg(osg_df.copy(), product_df.copy())
+
+    return out, [
+        ('all_store', 'ingest', 'sales', lambda: read_upload(paths['sales'], ALL_STORE_SALES)),
+        ('all_store', 'aggregate', 'report', all_store_aggregate),
+        ('all_store', 'write_excel', None, lambda: build_all_store_workbook(*out['report'])),
+        ('all_store', 'render_pdf', None, lambda: build_rbm_pdfs(out['report'][1])),
+        ('all_store', 'render_pdf_serial', None, lambda: build_rbm_pdfs(out['report'][1], parallel=False)),
+        ('day_view', 'ingest', 'day_sales', lambda: read_upload(paths['sales'], DAY_VIEW_SALES)),
+        ('day_view', 'aggregate', 'day_view', lambda: build_day_view(out['day_sales'], future_stores)),
+        ('day_view', 'write_excel', None, lambda: generate_report2_excel(out['day_view'])),
+        ('day_view', 'write_csv', None, lambda: csv_bytes(out['day_view'])),
+        ('osg_mapping', 'ingest', 'osg', osg_ingest),
+        ('osg_mapping', 'map', 'mapped', osg_map),
+        ('osg_mapping', 'write_excel', None, lambda: mapped_report_excel(out['mapped'])),
+        ('osg_mapping', 'write_csv', None, lambda: mapped_report_csv(out['mapped'])),
+    ] + ([
+        ('day_view', 'write_parquet', None, lambda: parquet_bytes(out['day_view'])),
+        ('osg_mapping', 'write_parquet', None, lambda: mapped_report_parquet(out['mapped'])),
+    ] if parquet_available() else [])
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def run(rows, data_dir, repeat=3, memory=True, report_date=None):
+    """Benchmark records, one per stage, for inputs of `rows` rows."""
+    report_date = report_date or date.today()
+    paths = write_inputs(data_dir, rows, report_date)
+    out, stages = pipeline_stages(paths, report_date)
+    records = []
+    for pipeline, stage, name, func in stages:
+        result, seconds, peak = measure(func, repeat, memory)
+        if name:
+            out[name] = result
+        records.append({
+            'pipeline': pipeline, 'stage': stage, 'rows': rows,
+            'seconds': round(seconds, 4), 'rows_per_s': round(rows / seconds) if seconds else None,
+            'peak_mib': None if peak is None else round(peak, 1),
+        })
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report pipelines stage by stage.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run for peak memory")
+    parser.add_argument("--data", default="bench-data", help="directory for the generated inputs")
+    parser.add_argument("--json", help="append one JSON record per stage to this file")
+    args = parser.parse_args(argv)
+
+    run_info = {'run_at': datetime.now().isoformat(timespec='seconds'), 'revision': _revision()}
+    print(f"{'pipeline':<12} {'stage':<18} {'rows':>9} {'seconds':>9} {'rows/s':>11} {'peak MiB':>9}")
+    for rows in args.rows:
+        for record in run(rows, args.data, args.repeat, not args.no_memory):
+            peak = '-' if record['peak_mib'] is None else record['peak_mib']
+            print(f"{record['pipeline']:<12} {record['stage']:<18} {record['rows']:>9} "
+                  f"{record['seconds']:>9} {record['rows_per_s']:>11} {peak:>9}")
+            if args.json:
+                with open(args.json, 'a') as f:
+                    f.write(json.dumps({**run_info, **record}) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Time the dashboard's cold start: importing streamlit, the first render and a rerun.
+
+    python -m benchmarks.startup --repeat 5 --json startup-results.jsonl
+
+Every run is a fresh interpreter that renders streamlit_app.py headlessly
+(streamlit.testing) with no uploads, against the reference workbooks in
+--data-dir. Besides the best times it reports which heavy optional modules
+(openpyxl, reportlab) were already loaded after the first render; they
+should only load once a report is written.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(REPO_DIR, "streamlit_app.py")
+HEAVY_MODULES = ['openpyxl', 'reportlab']
+
+# Runs in the fresh interpreter; prints one JSON record
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+app.run()
+rendered = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'first_render_s': rendered - imported,
+    'rerun_s': rerun - rendered,
+    'errors': [error.value for error in app.error] + [str(e.value) for e in app.exception],
+    'loaded': [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def probe(data_dir, cache_dir):
+    env = dict(os.environ, OSG_DATA_DIR=data_dir, OSG_RESULT_CACHE_DIR=cache_dir,
+               OSG_SALES_DB=os.path.join(cache_dir, "daily_sales.sqlite"),
+               OSG_STAGE_LOG=os.path.join(cache_dir, "stages.jsonl"))
+    result = subprocess.run([sys.executable, "-c", PROBE, APP, *HEAVY_MODULES],
+                            capture_output=True, text=True, env=env, cwd=REPO_DIR, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(data_dir, cache_dir, repeat=3):
+    """Best of `repeat` fresh-process runs, plus the errors and heavy modules of the last one."""
+    runs = [probe(data_dir, cache_dir) for _ in range(repeat)]
+    record = {key: round(min(r[key] for r in runs), 3) for key in ('import_s', 'first_render_s', 'rerun_s')}
+    record['total_s'] = round(record['import_s'] + record['first_render_s'], 3)
+    record['errors'] = runs[-1]['errors']
+    record['heavy_loaded'] = runs[-1]['loaded']
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's cold start.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=REPO_DIR, help="directory holding the reference workbooks")
+    parser.add_argument("--cache-dir", default=os.path.join("bench-data", "startup"),
+                        help="result cache, sales store and stage log of the benchmarked app")
+    parser.add_argument("--json", help="append the record to this file")
+    args = parser.parse_args(argv)
+
+    record = {'run_at': datetime.now().isoformat(timespec='seconds'),
+              **run(os.path.abspath(args.data_dir), os.path.abspath(args.cache_dir), args.repeat)}
+    for key in ('import_s', 'first_render_s', 'total_s', 'rerun_s'):
+        print(f"{key:<16} {record[key]:>8}")
+    print(f"{'heavy_loaded':<16} {', '.join(record['heavy_loaded']) or '-'}")
+    for error in record['errors']:
+        print(f"error: {error}")
+    if args.json:
+        with open(args.json, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Synthetic inputs shaped like the real uploads.
+
+    python -m benchmarks.synthetic --rows 100000 --out bench-data/
+
+Writes the sales workbook (All Store and Day View), the OSG and PRODUCT
+workbooks and the three reference workbooks. Stores are spread over RBMs
+with skewed counts and sell at skewed rates; every mobile buys several
+products, and Retailer SKUs are drawn from a small set of real plan
+families, slabs and durations so they repeat the way they do in practice.
+"""
+import argparse
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from osg_dashboard.excel_writer import frame_to_xlsx
+from osg_dashboard.sku_parser import SKU_CATEGORY_MAPPING
+
+SLABS = [(0, 10), (10, 20), (20, 40), (40, 60), (60, 100), (100, 200)]
+DURATIONS = ["Dur : 1+1", "Dur : 1+2", "Dur : 1+3", "Dur : 2", "1+2 SDP-1"]
+BRANDS = ["LG", "SAMSUNG", "SONY", "WHIRLPOOL", "GODREJ", "BAJAJ", "PHILIPS"]
+REGION_CODES = ["TVM", "KOC", "CLT", "KTM", "ALP", "TCR", "PKD", "KNR"]
+RBM_NAMES = ["ALFAS", "RENJITH", "SAMEER", "SAMEEM", "MAHESH", "VAISAKH", "ANOOP", "BIJU"]
+
+
+def _skewed(rng, n, alpha=1.2):
+    """Zipf-like probabilities over n items, in random order."""
+    weights = 1.0 / np.arange(1, n + 1) ** alpha
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def reference_frames(n_stores=126, n_rbms=6, n_future=44, seed=0):
+    """(store list, RBM/BDM/Branch, future store list) with skewed store counts per RBM."""
+    rng = np.random.default_rng(seed)
+    stores = [f"STORE {i:03d}" for i in range(n_stores)]
+    rbms = RBM_NAMES[:n_rbms]
+    rbm_of_store = rng.choice(rbms, size=n_stores, p=_skewed(rng, n_rbms, alpha=0.8))
+    bdm_of_store = [f"{rbm} BDM {rng.integers(1, 4)}" for rbm in rbm_of_store]
+    store_list = pd.DataFrame({'Store': stores})
+    rbm_bdm = pd.DataFrame({'RBM': rbm_of_store, 'BDM': bdm_of_store, 'Branch': stores})
+    future = pd.DataFrame({'Store': [f"{store} FUTURE" for store in stores[:n_future]]})
+    return store_list, rbm_bdm, future
+
+
+def sales_frame(rows, stores, report_date, seed=0):
+    """Month-to-date sales lines up to `report_date`, stores selling at skewed rates."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(report_date.replace(day=1), report_date).strftime('%d-%m-%Y')
+    return pd.DataFrame({
+        'Branch': np.asarray(stores, dtype=object)[rng.choice(len(stores), size=rows, p=_skewed(rng, len(stores), 0.7))],
+        'DATE': np.asarray(days, dtype=object)[rng.integers(0, len(days), rows)],
+        'QUANTITY': rng.integers(1, 4, rows),
+        'AMOUNT': rng.lognormal(8.5, 1.0, rows).round(2),
+    })
+
+
+def _retailer_sku(category, rate, rng):
+    """A Retailer SKU whose plan family covers `category` and whose slab contains `rate`."""
+    families = [family for family, keywords in SKU_CATEGORY_MAPPING.items() if category in keywords]
+    family = families[rng.integers(0, len(families))]
+    slab = next(((lo, hi) for lo, hi in SLABS if lo * 1000 <= rate < hi * 1000), SLABS[-1])
+    return f"{family} Slab : {slab[0]}K-{slab[1]}K {DURATIONS[rng.integers(0, len(DURATIONS))]}"
+
+
+def osg_product_frames(rows, products_per_mobile=3.0, seed=0):
+    """(OSG, PRODUCT) frames: `rows` OSG lines, each bought by a mobile with several products."""
+    rng = np.random.default_rng(seed)
+    categories = sorted({kw for keywords in SKU_CATEGORY_MAPPING.values() for kw in keywords})
+    n_mobiles = max(1, int(rows / 1.5))
+
+    per_mobile = 1 + rng.poisson(products_per_mobile - 1, n_mobiles)
+    mobiles = np.repeat(9_000_000_000 + rng.choice(900_000_000, n_mobiles, replace=False), per_mobile)
+    n_products = len(mobiles)
+    category = np.asarray(categories, dtype=object)[rng.choice(len(categories), n_products, p=_skewed(rng, len(categories)))]
+    rate = rng.lognormal(9.8, 0.8, n_products).round(-1)
+    invoice = [f"INV {REGION_CODES[i % len(REGION_CODES)]} {n}"
+               for i, n in zip(rng.integers(0, 64, n_products), rng.integers(1, 99999, n_products))]
+    product_df = pd.DataFrame({
+        'Customer Mobile': mobiles,
+        'Model': [f"{cat[:3]}-{n}" for cat, n in zip(category, rng.integers(1, 40, n_products))],
+        'Category': category,
+        'Invoice Number': invoice,
+        'Item Rate': rate,
+        'IMEI': rng.integers(10**14, 10**15, n_products).astype(str),
+        'Brand': np.asarray(BRANDS, dtype=object)[rng.integers(0, len(BRANDS), n_products)],
+    })
+
+    # Plans are sold against a product of the mobile; a few reference an
+    # unknown mobile or another invoice so every matching path is exercised
+    sold = rng.integers(0, n_products, rows)
+    sku_cache = {}
+    skus = []
+    for cat, r in zip(category[sold], rate[sold]):
+        key = (cat, int(r) // 10000)
+        if key not in sku_cache:
+            sku_cache[key] = [_retailer_sku(cat, r, rng) for _ in range(2)]
+        skus.append(sku_cache[key][rng.integers(0, 2)])
+    unknown = rng.random(rows) < 0.05
+    osg_df = pd.DataFrame({
+        'Customer Mobile': np.where(unknown, 8_000_000_000 + rng.integers(0, 10**6, rows), mobiles[sold]),
+        'Date': pd.Timestamp(date.today()).normalize() - pd.to_timedelta(rng.integers(0, 30, rows), unit='D'),
+        'Invoice Number': np.where(rng.random(rows) < 0.8, np.asarray(invoice, dtype=object)[sold], "INV MISC 0"),
+        'Customer Name': [f"CUSTOMER {i}" for i in range(rows)],
+        'Retailer SKU': skus,
+        'Plan Price': np.where(rng.random(rows) < 0.02, -1, (rate[sold] * 0.08).round()),
+    })
+    return osg_df, product_df
+
+
+def write_inputs(out_dir, rows, report_date=None, seed=0):
+    """Write every input workbook for `rows` rows into `out_dir`, reusing files that already exist."""
+    report_date = report_date or date.today()
+    os.makedirs(out_dir, exist_ok=True)
+    store_list, rbm_bdm, future = reference_frames(seed=seed)
+    paths = {
+        'store_list': os.path.join(out_dir, "store_list.xlsx"),
+        'rbm_bdm': os.path.join(out_dir, "rbm_bdm.xlsx"),
+        'future_store': os.path.join(out_dir, "future_store.xlsx"),
+        'sales': os.path.join(out_dir, f"sales_{rows}_{report_date:%Y%m%d}_{seed}.xlsx"),
+        'osg': os.path.join(out_dir, f"osg_{rows}_{seed}.xlsx"),
+        'product': os.path.join(out_dir, f"product_{rows}_{seed}.xlsx"),
+    }
+
+    def write(path, make):
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(frame_to_xlsx(make()))
+
+    write(paths['store_list'], lambda: store_list)
+    write(paths['rbm_bdm'], lambda: rbm_bdm)
+    write(paths['future_store'], lambda: future)
+    write(paths['sales'], lambda: sales_frame(rows, list(rbm_bdm['Branch']) + list(future['Store']), report_date, seed))
+    if not (os.path.exists(paths['osg']) and os.path.exists(paths['product'])):
+        osg_df, product_df = osg_product_frames(rows, seed=seed)
+        write(paths['osg'], lambda: osg_df)
+        write(paths['product'], lambda: product_df)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic dashboard inputs.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench-data")
+    args = parser.parse_args(argv)
+    for path in write_inputs(args.out, args.rows, args.date, args.seed).values():
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Report pipelines behind the OSG dashboard."""
@@ -0,0 +1,5 @@
+import sys
+
+from osg_dashboard.cli import main
+
+sys.exit(main())
@@ -0,0 +1,146 @@
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from osg_dashboard.bundle import zip_bytes
+from osg_dashboard.date_windows import SalesByDate, standard_windows, window_columns
+from osg_dashboard.excel_writer import StyledRows
+from osg_dashboard.instrumentation import instrumented
+from osg_dashboard.rbm_pdf import iter_rbm_pdfs
+from osg_dashboard.sales_store import daily_totals, sales_days
+from osg_dashboard.store_dimension import HIERARCHY_COLUMNS, StoreDimension
+
+COLUMNS_TO_USE = ['Store', 'FTD Count', 'FTD Amount', 'MTD Count', 'MTD Amount']
+TOTAL_COLUMNS = COLUMNS_TO_USE[1:]
+# A store row with a zero in any of these gets the red fill
+ZERO_QTY_COLUMNS = ['FTD Count', 'MTD Count']
+
+# One RBM's stores sorted by MTD Amount, with int totals keyed by report_total_columns()
+RbmPartition = namedtuple('RbmPartition', ['rbm', 'data', 'totals'])
+
+
+def _named_styles():
+    """The four cell styles of the All Store workbook, registered once per workbook."""
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+    from openpyxl.styles.fonts import DEFAULT_FONT
+
+    border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+    center = Alignment(horizontal='center')
+
+    def style(name, color, font=DEFAULT_FONT):
+        fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        return NamedStyle(name=name, fill=fill, font=font, border=border, alignment=center)
+
+    return [
+        style('All Store Header', "4F81BD", Font(bold=True, color="FFFFFF")),
+        style('All Store Data', "DCE6F1"),
+        style('All Store Zero Qty', "F4CCCC"),
+        style('All Store Total', "FFD966", Font(bold=True)),
+    ]
+
+
+def build_report_df(book1_df, future_store_df, rbm_bdm_df, report_date, extra_windows=()):
+    """Per-store FTD/MTD counts and amounts with RBM/BDM, sorted by MTD Amount."""
+    stores = StoreDimension(future_store_df['Store'], rbm_bdm_df)
+    return report_from_daily(daily_totals(sales_days(book1_df)), stores, report_date, extra_windows)
+
+
+@instrumented('aggregate')
+def report_from_daily(daily, stores, report_date, extra_windows=()):
+    """The All Store report from per-store daily totals (see sales_store.daily_totals).
+
+    `stores` is the StoreDimension of the store list and RBM/BDM table. FTD
+    is `report_date` itself and MTD runs from the first of its month up to
+    and including `report_date`. `extra_windows` (date_windows.Window) add
+    their own Count and Amount columns after MTD. Every store in `daily` or
+    the store list gets a row; windows are summed and joined on store IDs.
+    """
+    windows = standard_windows(report_date) + list(extra_windows)
+    stores = stores.extended(daily['Store'])
+    store_id = stores.ids(daily['Store'])
+    totals = SalesByDate(daily.assign(Store=store_id)[store_id >= 0]).totals(windows)
+
+    # Listed stores first, then stores only seen in the sales, in order of first appearance
+    store_ids = pd.unique(np.concatenate([np.arange(stores.listed), store_id[store_id >= 0]]))
+    report_df = stores.table.loc[store_ids, ['Store']].reset_index(drop=True)
+    total_columns = window_columns(windows)
+    report_df[total_columns] = totals.reindex(store_ids, fill_value=0)[total_columns].astype(int).to_numpy()
+    report_df[HIERARCHY_COLUMNS] = stores.table.loc[store_ids, HIERARCHY_COLUMNS].to_numpy()
+    return report_df.sort_values('MTD Amount', ascending=False)
+
+
+def report_total_columns(report_df):
+    """The Count and Amount columns of `report_df`: TOTAL_COLUMNS plus any extra windows."""
+    return [col for col in report_df.columns if col.endswith((' Count', ' Amount'))]
+
+
+def column_totals(data):
+    return {col: int(total) for col, total in data[report_total_columns(data)].sum().items()}
+
+
+@instrumented('partition_by_rbm')
+def partition_by_rbm(report_df):
+    """Split `report_df` by RBM in one grouping pass, in order of first appearance.
+
+    Every renderer (Excel sheets, PDFs) consumes these partitions instead of
+    filtering `report_df` per RBM itself. Stores without an RBM are left out.
+    """
+    totals = report_df.groupby('RBM', sort=False)[report_total_columns(report_df)].sum()
+    partitions = []
+    for rbm, rbm_data in report_df.groupby('RBM', sort=False):
+        rbm_totals = {col: int(total) for col, total in totals.loc[rbm].items()}
+        partitions.append(RbmPartition(rbm, rbm_data.sort_values('MTD Amount', ascending=False), rbm_totals))
+    return partitions
+
+
+def write_to_sheet(ws, data, styles, totals):
+    """Stream the store rows of `data` plus a TOTAL row into a write-only sheet.
+
+    Rows with a zero FTD or MTD count get the red fill.
+    """
+    rows = StyledRows(ws, styles)
+    total_columns = report_total_columns(data)
+    columns = ['Store'] + total_columns
+    zero_qty_at = [columns.index(col) for col in ZERO_QTY_COLUMNS]
+    ws.append(rows.row(columns, 'All Store Header'))
+    for row in data[columns].itertuples(index=False):
+        zero_qty = any(row[i] == 0 for i in zero_qty_at)
+        ws.append(rows.row(row, 'All Store Zero Qty' if zero_qty else 'All Store Data'))
+    ws.append(rows.row(["TOTAL"] + [totals[col] for col in total_columns], 'All Store Total'))
+
+
+@instrumented('write_excel')
+def build_all_store_workbook(report_df, partitions):
+    """All_Stores sheet plus one sheet per RBM, streamed with openpyxl's write-only mode."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    styles = _named_styles()
+    for named in styles:
+        wb.add_named_style(named)
+
+    write_to_sheet(wb.create_sheet(title="All_Stores"), report_df, styles, column_totals(report_df))
+    for partition in partitions:
+        write_to_sheet(wb.create_sheet(title=partition.rbm[:30]), partition.data, styles, partition.totals)
+
+    excel_buffer = BytesIO()
+    wb.save(excel_buffer)
+    return excel_buffer.getvalue()
+
+
+def excel_file_name(report_date):
+    return f"Sales_Report_{report_date.strftime('%Y%m%d')}.xlsx"
+
+
+def iter_report_files(report_df, partitions, report_date, parallel=True):
+    """(file name, bytes) for the workbook and then each RBM PDF, rendered only as they are consumed."""
+    yield excel_file_name(report_date), build_all_store_workbook(report_df, partitions)
+    yield from iter_rbm_pdfs(partitions, parallel)
+
+
+@instrumented('zip_bundle')
+def build_report_bundle(report_df, partitions, report_date):
+    """ZIP of the workbook and all RBM PDFs, compressed file by file as each is rendered."""
+    return zip_bytes(iter_report_files(report_df, partitions, report_date))
@@ -0,0 +1,40 @@
+import io
+import zipfile
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable sink that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_chunks(files, compression=zipfile.ZIP_DEFLATED):
+    """Build a ZIP archive incrementally from an iterable of (name, bytes).
+
+    `files` may be a generator that renders each file on demand; every file is
+    compressed and yielded as soon as it arrives, so at most one file and its
+    compressed form are held at a time.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode='w', compression=compression) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def zip_bytes(files, compression=zipfile.ZIP_DEFLATED):
+    return b''.join(zip_chunks(files, compression))
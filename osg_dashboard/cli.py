@@ -0,0 +1,174 @@
+"""Generate the dashboard reports without the Streamlit UI.
+
+    python -m osg_dashboard --out reports/ all-store SALES.xlsx [SALES.xlsx ...] --date 2025-05-20 [--date ...]
+        [--compare WTD|SDLM|LMTD ...] [--range 2025-05-01 2025-05-15]
+    python -m osg_dashboard --out reports/ day-view SALES.xlsx [SALES.xlsx ...] [--format xlsx|csv|parquet]
+    python -m osg_dashboard --out reports/ osg-mapping OSG.xlsx PRODUCT.xlsx [--chunk-rows 20000]
+        [--format xlsx|csv|parquet]
+
+Every input file is parsed in its own job, and all-store spreads a file's
+dates over several jobs when there are more workers than files; `--jobs` runs
+them in parallel worker processes.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from osg_dashboard.all_store_report import iter_report_files, partition_by_rbm, report_from_daily
+from osg_dashboard.date_windows import custom_window, standard_windows
+from osg_dashboard.day_view_report import DAY_VIEW_REPORTS, build_day_view
+from osg_dashboard.ingest import ALL_STORE_SALES, DAY_VIEW_SALES, OSG, PRODUCT, iter_upload_chunks, read_upload
+from osg_dashboard.osg_mapping import MAPPED_REPORTS, map_osg, map_osg_chunks, write_mapped_report
+from osg_dashboard.reference_data import FUTURE_STORE_FILE, RBM_BDM_FILE, STORE_LIST_FILE, read_reference
+from osg_dashboard.sales_store import daily_totals, sales_days
+from osg_dashboard.store_dimension import StoreDimension
+
+
+def write_files(out_dir, files):
+    """Write (file name, bytes) pairs into `out_dir` and return the paths written."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, data in files:
+        path = os.path.join(out_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def all_store_job(sales_path, stores, runs, parallel=True):
+    """All Store workbook and RBM PDFs of one sales file for each (report date, extra windows, out dir) in `runs`.
+
+    The file is parsed once; its daily totals serve every run.
+    """
+    daily = daily_totals(sales_days(read_upload(sales_path, ALL_STORE_SALES)))
+    paths = []
+    for report_date, extra_windows, out_dir in runs:
+        report_df = report_from_daily(daily, stores, report_date, extra_windows)
+        partitions = partition_by_rbm(report_df)
+        paths += write_files(out_dir, iter_report_files(report_df, partitions, report_date, parallel))
+    return paths
+
+
+def day_view_job(sales_path, future_stores, out_dir, fmt='xlsx'):
+    report = build_day_view(read_upload(sales_path, DAY_VIEW_SALES), future_stores)
+    return write_files(out_dir, [(f"Store_Summary_Report.{fmt}", DAY_VIEW_REPORTS[fmt](report))])
+
+
+def osg_mapping_job(osg_path, product_path, out_dir, chunk_rows=None, fmt='xlsx'):
+    product_df = read_upload(product_path, PRODUCT)
+    name = f"OSG_Product_Mapping_Report.{fmt}"
+    if not chunk_rows:
+        osg_df = map_osg(read_upload(osg_path, OSG), product_df)
+        return write_files(out_dir, [(name, MAPPED_REPORTS[fmt](osg_df))])
+    # Memory holds the PRODUCT side and one chunk of OSG rows, whatever the OSG file size
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, name)
+    write_mapped_report(map_osg_chunks(iter_upload_chunks(osg_path, OSG, chunk_rows), product_df), path, fmt)
+    return [path]
+
+
+def _job_dir(out_dir, path, several):
+    # Several inputs (regions) get one sub-directory each so their files do not collide
+    if not several:
+        return out_dir
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def _all_store_jobs(args):
+    stores = StoreDimension(read_reference(args.store_list)['Store'], read_reference(args.rbm_bdm))
+    dates = args.date or [date.today()]
+    several = len(args.sales) > 1
+    # Workers left over once every file has one share out its dates; each
+    # extra job parses the file again, so there are never more than workers
+    splits = max(1, min(len(dates), args.jobs // len(args.sales)))
+    jobs = []
+    for sales_path in args.sales:
+        runs = []
+        for report_date in dates:
+            extra_windows = standard_windows(report_date, args.compare or [])
+            if args.range:
+                extra_windows.append(custom_window(*args.range))
+            runs.append((report_date, extra_windows,
+                         os.path.join(_job_dir(args.out, sales_path, several), report_date.isoformat())))
+        jobs += [(all_store_job, sales_path, stores, runs[i::splits]) for i in range(splits)]
+    return jobs
+
+
+def _day_view_jobs(args):
+    future_stores = StoreDimension(read_reference(args.future_store)['Store'])
+    several = len(args.sales) > 1
+    return [(day_view_job, path, future_stores, _job_dir(args.out, path, several), args.format) for path in args.sales]
+
+
+def _osg_mapping_jobs(args):
+    return [(osg_mapping_job, args.osg, args.product, args.out, args.chunk_rows, args.format)]
+
+
+def _run(job):
+    func, *args = job
+    return func(*args)
+
+
+def run_jobs(jobs, workers):
+    """Run jobs in `workers` processes (in this process when 1); yields each job's paths in order."""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _run(job)
+        return
+    # PDFs are already rendered one job per process; no nested render pool
+    jobs = [job + (False,) if job[0] is all_store_job else job for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        yield from pool.map(_run, jobs)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="osg_dashboard", description="Generate OSG dashboard reports headlessly.")
+    parser.add_argument("--out", default=".", help="output directory (default: current directory)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="parallel worker processes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    all_store = commands.add_parser("all-store", help="All Store Excel report and RBM PDFs")
+    all_store.add_argument("sales", nargs="+", help="full month sales xlsx, one per region")
+    all_store.add_argument("--date", action="append", type=date.fromisoformat,
+                           help="report date as YYYY-MM-DD; repeat for several days (default: today)")
+    all_store.add_argument("--compare", action="append", choices=["WTD", "SDLM", "LMTD"],
+                           help="extra window: week to date, same day last month, last month to date; repeatable")
+    all_store.add_argument("--range", nargs=2, type=date.fromisoformat, metavar=("START", "END"),
+                           help="extra window over a custom range of days")
+    all_store.add_argument("--store-list", default=STORE_LIST_FILE)
+    all_store.add_argument("--rbm-bdm", default=RBM_BDM_FILE)
+    all_store.set_defaults(jobs_for=_all_store_jobs)
+
+    day_view = commands.add_parser("day-view", help="Day View store summary")
+    day_view.add_argument("sales", nargs="+", help="daily sales xlsx, one per region")
+    day_view.add_argument("--future-store", default=FUTURE_STORE_FILE)
+    day_view.add_argument("--format", choices=list(DAY_VIEW_REPORTS), default="xlsx",
+                          help="xlsx with zero-amount stores in red, or csv or parquet with a Highlight column "
+                               "(default: xlsx)")
+    day_view.set_defaults(jobs_for=_day_view_jobs)
+
+    osg_mapping = commands.add_parser("osg-mapping", help="OSG and product data mapping")
+    osg_mapping.add_argument("osg")
+    osg_mapping.add_argument("product")
+    osg_mapping.add_argument("--chunk-rows", type=int,
+                             help="stream the OSG file this many rows at a time, for files too large to load")
+    osg_mapping.add_argument("--format", choices=list(MAPPED_REPORTS), default="xlsx",
+                             help="xlsx with highlighted rows, or csv or parquet with a Highlight column "
+                                  "(default: xlsx; parquet cannot be streamed with --chunk-rows)")
+    osg_mapping.set_defaults(jobs_for=_osg_mapping_jobs)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        for paths in run_jobs(args.jobs_for(args), args.jobs):
+            for path in paths:
+                print(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
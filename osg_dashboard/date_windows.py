@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# A named reporting period; `start` and `end` are days and both are included
+Window = namedtuple('Window', ['name', 'start', 'end'])
+
+# FTD: the report date; WTD: from its Monday; MTD: from the 1st of its month;
+# SDLM: the same day last month; LMTD: last month up to SDLM
+WINDOW_NAMES = ['FTD', 'WTD', 'MTD', 'SDLM', 'LMTD']
+DEFAULT_WINDOWS = ['FTD', 'MTD']
+
+
+def standard_windows(report_date, names=DEFAULT_WINDOWS):
+    """The windows called `names` (see WINDOW_NAMES) for `report_date`, in the order given."""
+    day = pd.Timestamp(report_date).normalize()
+    month_start = day.replace(day=1)
+    # DateOffset clips to the end of a shorter month (31 March -> 28/29 February)
+    same_day_last_month = day - pd.DateOffset(months=1)
+    windows = {
+        'FTD': Window('FTD', day, day),
+        'WTD': Window('WTD', day - pd.Timedelta(days=day.weekday()), day),
+        'MTD': Window('MTD', month_start, day),
+        'SDLM': Window('SDLM', same_day_last_month, same_day_last_month),
+        'LMTD': Window('LMTD', same_day_last_month.replace(day=1), same_day_last_month),
+    }
+    return [windows[name] for name in names]
+
+
+def custom_window(start, end):
+    """A window over an arbitrary range of days, named after it."""
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    return Window(f"{start:%d-%m-%Y} to {end:%d-%m-%Y}", start, end)
+
+
+def window_span(windows):
+    """(first day, last day) covered by any of `windows`."""
+    return min(window.start for window in windows), max(window.end for window in windows)
+
+
+def window_columns(windows):
+    return [f"{window.name} {measure}" for window in windows for measure in ('Count', 'Amount')]
+
+
+class SalesByDate:
+    """Daily totals (see sales_store.daily_totals) sorted and indexed by day.
+
+    The rows of any window are one contiguous slice, located with two binary
+    searches on the sorted days.
+    """
+
+    def __init__(self, daily):
+        self.daily = daily.sort_values('DATE', kind='stable', ignore_index=True)
+        self.days = self.daily['DATE'].to_numpy()
+        self.store_code, self.stores = pd.factorize(self.daily['Store'])
+
+    def bounds(self, window):
+        """Row range [lo, hi) of the days in `window`."""
+        start, end = (pd.Timestamp(day).to_datetime64().astype(self.days.dtype) for day in (window.start, window.end))
+        return (int(np.searchsorted(self.days, start, side='left')),
+                int(np.searchsorted(self.days, end, side='right')))
+
+    def totals(self, windows):
+        """Count and Amount per store for every window, aggregated in one grouped pass.
+
+        Returns a frame indexed by Store with window_columns(windows); stores
+        without sales in a window have 0 there.
+        """
+        bounds = [self.bounds(window) for window in windows]
+        rows = np.concatenate([np.arange(lo, hi) for lo, hi in bounds] + [np.array([], dtype=int)])
+        window_code = np.repeat(np.arange(len(windows)), [hi - lo for lo, hi in bounds])
+        picked = pd.DataFrame({
+            'Store': self.store_code[rows],
+            'window': window_code,
+            'Count': self.daily['QUANTITY'].to_numpy()[rows],
+            'Amount': self.daily['AMOUNT'].to_numpy()[rows],
+        })
+        sums = picked.groupby(['Store', 'window'])[['Count', 'Amount']].sum()
+        sums = sums.unstack('window', fill_value=0).reindex(
+            columns=pd.MultiIndex.from_product([['Count', 'Amount'], range(len(windows))]), fill_value=0
+        )
+        totals = pd.DataFrame(
+            {f"{window.name} {measure}": sums[(measure, i)].to_numpy()
+             for i, window in enumerate(windows) for measure in ('Count', 'Amount')},
+            index=pd.Index(self.stores.take(sums.index), name='Store'),
+        )
+        return totals
@@ -0,0 +1,100 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from osg_dashboard.exports import HIGHLIGHT_COLUMN, csv_bytes, parquet_bytes
+from osg_dashboard.instrumentation import instrumented
+
+
+@instrumented('aggregate')
+def build_day_view(book2_df, stores):
+    """Quantity and amount per store, every future store included, plus a TOTAL row.
+
+    `stores` is the StoreDimension of the future store list; sales are summed
+    and joined on store IDs.
+    """
+    stores = stores.extended(book2_df['Branch'])
+    store_id = stores.ids(book2_df['Branch'])
+    agg = book2_df[['QUANTITY', 'AMOUNT']][store_id >= 0].groupby(store_id[store_id >= 0]).sum()
+
+    # Future stores in list order, then stores only in the sales file by name
+    extra_names = stores.table['Store'].take(np.unique(store_id[store_id >= stores.listed]))
+    store_ids = np.concatenate([np.arange(stores.listed), extra_names.sort_values(kind='stable').index])
+    merged = stores.table.loc[store_ids, ['Store']].reset_index(drop=True)
+    merged[['QUANTITY', 'AMOUNT']] = agg.reindex(store_ids, fill_value=0).astype(int).to_numpy()
+
+    merged = merged.sort_values(by='AMOUNT', ascending=False).reset_index(drop=True)
+    total = pd.DataFrame([{
+        'Store': 'TOTAL',
+        'QUANTITY': merged['QUANTITY'].sum(),
+        'AMOUNT': merged['AMOUNT'].sum()
+    }])
+    final_df = pd.concat([merged, total], ignore_index=True)
+    return final_df.rename(columns={'Store': 'Branch'})
+
+
+@instrumented('write_excel')
+def generate_report2_excel(df):
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils.dataframe import dataframe_to_rows
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Store Report"
+
+    header_fill = PatternFill("solid", fgColor="4F81BD")
+    data_fill = PatternFill("solid", fgColor="DCE6F1")
+    red_fill = PatternFill("solid", fgColor="F4CCCC")
+    total_fill = PatternFill("solid", fgColor="FFD966")
+    border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                    top=Side(style='thin'), bottom=Side(style='thin'))
+    bold_font = Font(bold=True)
+    header_font = Font(bold=True, color="FFFFFF")
+
+    for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
+        for c_idx, value in enumerate(row, 1):
+            cell = ws.cell(row=r_idx, column=c_idx, value=value)
+            if r_idx == 1:
+                cell.fill = header_fill
+                cell.font = header_font
+            elif df.loc[r_idx - 2, 'Branch'] == 'TOTAL':
+                cell.fill = total_fill
+                cell.font = bold_font
+            elif df.loc[r_idx - 2, 'AMOUNT'] <= 0:
+                cell.fill = red_fill
+            else:
+                cell.fill = data_fill
+            cell.border = border
+            cell.alignment = Alignment(horizontal='center')
+
+    for column_cells in ws.columns:
+        length = max(len(str(cell.value)) for cell in column_cells if cell.value)
+        ws.column_dimensions[column_cells[0].column_letter].width = length + 2
+
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def highlight_mask(df):
+    """True for the store rows generate_report2_excel fills red: AMOUNT of zero or less."""
+    return ((df['Branch'] != 'TOTAL') & (df['AMOUNT'] <= 0)).to_numpy()
+
+
+def with_highlight(df):
+    """`df` plus a HIGHLIGHT_COLUMN, True for the rows generate_report2_excel fills red."""
+    return df.assign(**{HIGHLIGHT_COLUMN: highlight_mask(df)})
+
+
+def report2_csv(df):
+    return csv_bytes(with_highlight(df))
+
+
+def report2_parquet(df):
+    return parquet_bytes(with_highlight(df))
+
+
+# Store summary writers by format (see exports.export_formats)
+DAY_VIEW_REPORTS = {'xlsx': generate_report2_excel, 'csv': report2_csv, 'parquet': report2_parquet}
@@ -0,0 +1,114 @@
+from copy import copy
+from io import BytesIO
+
+import numpy as np
+
+# openpyxl is imported where workbooks are built, so it only loads once a
+# report is actually written.
+
+
+class StyledRows:
+    """Builds write-only rows whose cells share the workbook's named styles."""
+
+    def __init__(self, ws, styles):
+        from openpyxl.cell import Cell, WriteOnlyCell
+
+        # One template cell per style; data cells copy its style array instead
+        # of resolving the named style again.
+        self.ws = ws
+        self._cell_type = Cell
+        self._new_cell = WriteOnlyCell
+        self.templates = {}
+        for named in styles:
+            template = self._new_cell(ws)
+            template.style = named.name
+            self.templates[named.name] = template._style
+
+    def row(self, values, style_name):
+        template = self.templates[style_name]
+        cells = []
+        for value in values:
+            cell = value if isinstance(value, self._cell_type) else self._new_cell(self.ws, value=value)
+            # Keep the number format the value was bound with (dates)
+            num_fmt_id = cell._style.numFmtId if cell.has_style else 0
+            cell._style = copy(template)
+            if num_fmt_id:
+                cell._style.numFmtId = num_fmt_id
+            cells.append(cell)
+        return cells
+
+
+# Rows converted to cell values at a time by frame_to_xlsx
+CHUNK_ROWS = 10_000
+
+# Same number format pandas' ExcelWriter gives datetime cells
+DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+
+
+def cell_values(ws, series):
+    """Column values ready for a write-only sheet: missing values become empty cells."""
+    from openpyxl.cell import WriteOnlyCell
+
+    values = series.to_numpy(dtype=object, copy=True)
+    missing = series.isna().to_numpy()
+    values[missing] = None
+    if series.dtype.kind == 'M':
+        for i in np.flatnonzero(~missing):
+            cell = WriteOnlyCell(ws, value=values[i])
+            cell.number_format = DATETIME_FORMAT
+            values[i] = cell
+    return values
+
+
+class XlsxStream:
+    """Write-only workbook that frames are appended to one after another.
+
+    The header row is written from the first frame's columns; later frames
+    must have the same columns. Rows are flushed to openpyxl's temporary
+    file as they are appended, so memory holds one block of rows (plus the
+    workbook's shared strings) however many frames go in. close() saves the
+    workbook to `out`, a path or binary file.
+    """
+
+    def __init__(self, out, styles=(), sheet_title='Sheet1'):
+        from openpyxl import Workbook
+
+        self.out = out
+        self.wb = Workbook(write_only=True)
+        for named in styles:
+            self.wb.add_named_style(named)
+        self.ws = self.wb.create_sheet(title=sheet_title)
+        self.rows = StyledRows(self.ws, styles)
+        self.style_name = styles[0].name if styles else None
+        self.header = None
+
+    def append(self, df, row_style=None):
+        """Append `df`'s rows; where the optional boolean mask `row_style` is True they get the first style."""
+        ws = self.ws
+        if self.header is None:
+            self.header = [str(col) for col in df.columns]
+            ws.append(self.header)
+        flags = np.zeros(len(df), dtype=bool) if row_style is None else np.asarray(row_style, dtype=bool)
+        # Cell values are materialised as Python objects one block of rows at a time
+        for start in range(0, len(df), CHUNK_ROWS):
+            chunk = df.iloc[start:start + CHUNK_ROWS]
+            columns = [cell_values(ws, chunk.iloc[:, i]) for i in range(chunk.shape[1])]
+            for flagged, values in zip(flags[start:start + CHUNK_ROWS], zip(*columns)):
+                ws.append(self.rows.row(values, self.style_name) if flagged else values)
+
+    def close(self):
+        self.wb.save(self.out)
+
+
+def frame_to_xlsx(df, row_style=None, styles=(), sheet_title='Sheet1'):
+    """Stream `df` with a plain header row into a write-only workbook and return the bytes.
+
+    `row_style` is an optional boolean mask; rows where it is True get the
+    first of `styles` (NamedStyles registered on the workbook), the rest are
+    written as plain values.
+    """
+    buf = BytesIO()
+    stream = XlsxStream(buf, styles, sheet_title)
+    stream.append(df, row_style)
+    stream.close()
+    return buf.getvalue()
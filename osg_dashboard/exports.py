@@ -0,0 +1,74 @@
+from importlib.util import find_spec
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from osg_dashboard.instrumentation import instrumented
+
+# Download formats offered next to the styled workbooks, by file extension
+MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+FORMAT_LABELS = {
+    'xlsx': 'Excel (styled)',
+    'csv': 'CSV',
+    'parquet': 'Parquet',
+}
+
+# Column that stands in for the workbook's row highlighting in csv and parquet
+HIGHLIGHT_COLUMN = 'Highlight'
+
+
+def parquet_available():
+    """Parquet needs pyarrow, which is optional."""
+    return find_spec('pyarrow') is not None
+
+
+def export_formats():
+    """Formats a report can be downloaded in here: xlsx, csv and, with pyarrow, parquet."""
+    return ['xlsx', 'csv'] + (['parquet'] if parquet_available() else [])
+
+
+@instrumented('write_csv')
+def csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+
+_NUMBER_KINDS = {'integer', 'floating', 'mixed-integer-float', 'decimal'}
+
+
+def _single_type(values):
+    categorical = isinstance(values.dtype, pd.CategoricalDtype)
+    distinct = pd.Series(values.cat.categories if categorical else values.dropna().unique(), dtype=object)
+    if pd.api.types.infer_dtype(distinct, skipna=True) in ('string', 'empty', 'boolean'):
+        return values
+    # Numbers with '' for "no value", e.g. the pooled Item Rate
+    if pd.api.types.infer_dtype(distinct[distinct != ''], skipna=True) in _NUMBER_KINDS:
+        raw = values.astype(object)
+        return pd.to_numeric(raw.where(raw != '', np.nan))
+    return values.astype(object).where(values.notna()).map(str, na_action='ignore').astype('str')
+
+
+def typed_columns(df):
+    """`df` with one Parquet type per column.
+
+    Number, date and text columns pass through; text categoricals stay
+    dictionary encoded. Columns mixing numbers with '' become numeric with
+    nulls, and any other mix becomes text.
+    """
+    return pd.DataFrame({
+        col: _single_type(df[col]) if df[col].dtype == object or isinstance(df[col].dtype, pd.CategoricalDtype)
+        else df[col]
+        for col in df.columns
+    })
+
+
+@instrumented('write_parquet')
+def parquet_bytes(df):
+    buf = BytesIO()
+    typed_columns(df).to_parquet(buf, index=False)
+    return buf.getvalue()
@@ -0,0 +1,200 @@
+import os
+from collections import namedtuple
+from concurrent.futures.process import BrokenProcessPool
+from importlib.util import find_spec
+from io import BytesIO
+from itertools import repeat
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from osg_dashboard.instrumentation import stage
+from osg_dashboard.osg_mapping import FINAL_COLUMNS
+from osg_dashboard.process_pool import discard_pool, shared_pool
+
+# Columns a report reads from an uploaded workbook. `required` columns must be
+# in the header row; `optional` ones are read when present. Everything else in
+# the sheet is skipped by the parser.
+#
+# Dtype policy: `dtypes` are applied by the parser; `categorical` columns are
+# low-cardinality dimensions (stores, models, SKUs...) kept as categoricals
+# after parsing; integer `downcast` columns are narrowed to the smallest
+# integer type that holds them. Float amounts stay float64 so sums are exact.
+ReportSchema = namedtuple('ReportSchema', ['name', 'required', 'optional', 'dtypes', 'categorical', 'downcast'],
+                          defaults=[(), ()])
+
+ALL_STORE_SALES = ReportSchema(
+    'Full Month sales Data', ['Branch', 'DATE', 'QUANTITY', 'AMOUNT'], ['Invoice Number'], {'Branch': str},
+    categorical=['Branch'], downcast=['QUANTITY', 'AMOUNT'],
+)
+DAY_VIEW_SALES = ReportSchema(
+    'Daily Sales Report', ['Branch', 'QUANTITY', 'AMOUNT'], ['Invoice Number'], {'Branch': str},
+    categorical=['Branch'], downcast=['QUANTITY', 'AMOUNT'],
+)
+OSG = ReportSchema(
+    'OSG File', ['Customer Mobile', 'Retailer SKU'], FINAL_COLUMNS, {},
+    categorical=['Retailer SKU', 'Branch', 'Region', 'Plan Type'], downcast=['Plan Price'],
+)
+PRODUCT = ReportSchema(
+    'PRODUCT File',
+    ['Customer Mobile', 'Model', 'Category', 'Invoice Number', 'Item Rate', 'IMEI', 'Brand'],
+    [],
+    {'Model': str, 'Category': str, 'Brand': str},
+    categorical=['Model', 'Category', 'Brand'], downcast=['Item Rate'],
+)
+
+
+# Rows per frame yielded by iter_upload_chunks
+STREAM_CHUNK_ROWS = 20_000
+
+# Occurrence of a line within its own file, used while merging uploads
+LINE_KEY = '_line'
+
+
+class MissingColumnsError(ValueError):
+    pass
+
+
+def excel_engine():
+    """calamine when python-calamine is installed, otherwise openpyxl (which pandas opens read-only)."""
+    return 'calamine' if find_spec('python_calamine') is not None else 'openpyxl'
+
+
+def read_header(file, engine=None):
+    """Column names from the header row, without parsing the rest of the sheet."""
+    header = pd.read_excel(file, nrows=0, engine=engine or excel_engine())
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return [str(col) for col in header.columns]
+
+
+def read_upload(file, schema):
+    """Read only the columns `schema` needs from an uploaded xlsx.
+
+    The header row is checked first, so a file missing a required column is
+    rejected with MissingColumnsError before the full parse.
+    """
+    with stage(f"read_upload: {schema.name}") as record:
+        engine = excel_engine()
+        header = read_header(file, engine)
+        missing = [col for col in schema.required if col not in header]
+        if missing:
+            raise MissingColumnsError(f"{schema.name} is missing column(s): {', '.join(missing)}")
+
+        wanted = set(schema.required) | set(schema.optional)
+        usecols = [col for col in header if col in wanted]
+        dtypes = {col: dtype for col, dtype in schema.dtypes.items() if col in usecols}
+        df = compact_columns(pd.read_excel(file, usecols=usecols, dtype=dtypes, engine=engine), schema)
+        record['rows'] = len(df)
+        return df
+
+
+def _chunk_frame(rows, columns, schema):
+    # The parser read_excel itself uses, so values (numbers in text cells,
+    # blanks, dtypes) come out the same as with read_upload()
+    dtypes = {col: dtype for col, dtype in schema.dtypes.items() if col in columns}
+    df = TextParser(rows, names=columns, dtype=dtypes or None).read()
+    return compact_columns(df, schema)
+
+
+def iter_upload_chunks(file, schema, chunk_rows=STREAM_CHUNK_ROWS):
+    """Read the columns `schema` needs from an xlsx `chunk_rows` rows at a time.
+
+    openpyxl's read-only mode parses the sheet as a stream, so only one chunk
+    of rows is in memory whatever the file size; it is several times slower
+    than read_upload(). Each chunk is typed on its own, like a small upload:
+    an integer column with a blank in one chunk is float in that chunk only.
+    Fully blank rows are skipped, as pandas does.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = [str(col) for col in next(rows, ())]
+        missing = [col for col in schema.required if col not in header]
+        if missing:
+            raise MissingColumnsError(f"{schema.name} is missing column(s): {', '.join(missing)}")
+
+        wanted = set(schema.required) | set(schema.optional)
+        positions = [i for i, col in enumerate(header) if col in wanted]
+        columns = [header[i] for i in positions]
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            chunk.append([row[i] if i < len(row) else None for i in positions])
+            if len(chunk) == chunk_rows:
+                yield _chunk_frame(chunk, columns, schema)
+                chunk = []
+        if chunk:
+            yield _chunk_frame(chunk, columns, schema)
+    finally:
+        wb.close()
+
+
+def compact_columns(df, schema):
+    """Apply the schema's categorical and integer downcast policy to a parsed upload."""
+    for col in schema.categorical:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in schema.downcast:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def merge_uploads(frames, schema):
+    """Concatenate the frames of several uploads, counting a line found in more than one file once.
+
+    Lines are compared on every column read (Invoice Number included when the
+    export has it). A line repeated within one file is kept as often as that
+    file repeats it, so only the overlap between files, e.g. two weekly
+    exports sharing a day, is dropped.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    with stage('merge_uploads') as record:
+        numbered = [
+            df.assign(**{LINE_KEY: df.groupby(list(df.columns), sort=False, dropna=False, observed=True).cumcount()})
+            for df in frames
+        ]
+        merged = pd.concat(numbered, ignore_index=True).drop_duplicates().drop(columns=LINE_KEY)
+        # Categoricals with different categories concatenate to plain columns
+        merged = compact_columns(merged.reset_index(drop=True), schema)
+        record['rows'] = len(merged)
+        return merged
+
+
+def _file_name(file):
+    return getattr(file, 'name', None) or os.path.basename(str(file))
+
+
+def _read_named(name, file, schema):
+    # Worker entry point; errors name the file they came from
+    try:
+        return read_upload(BytesIO(file) if isinstance(file, bytes) else file, schema)
+    except ValueError as e:
+        raise type(e)(f"{name}: {e}") from e
+
+
+def read_uploads(files, schema, parallel=True):
+    """Read several uploads of one schema (e.g. one per region or week) into a single frame.
+
+    Each file is header-checked and parsed by read_upload(), in a process pool
+    when there is more than one file and more than one core, then merged with
+    merge_uploads(). `files` are uploaded files or paths.
+    """
+    names = [_file_name(file) for file in files]
+    if parallel and len(files) > 1 and (os.cpu_count() or 1) > 1:
+        sources = [file.getvalue() if hasattr(file, 'getvalue') else file for file in files]
+        pool = shared_pool()
+        try:
+            with stage(f"read_uploads: {schema.name}") as record:
+                frames = list(pool.map(_read_named, names, sources, repeat(schema)))
+                record['rows'] = sum(len(df) for df in frames)
+            return merge_uploads(frames, schema)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); read the files here instead
+            discard_pool(pool)
+    return merge_uploads([_read_named(name, file, schema) for name, file in zip(names, files)], schema)
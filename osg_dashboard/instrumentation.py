@@ -0,0 +1,166 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGE_LOG = os.environ.get("OSG_STAGE_LOG", os.path.join(os.path.expanduser("~"), ".osg-dashboard", "stages.jsonl"))
+
+# tracemalloc slows pipelines down a lot, so it is only started on request
+if os.environ.get("OSG_TRACEMALLOC") == "1" and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+_current = ContextVar('osg_profile', default=None)
+_log_lock = threading.Lock()
+
+
+def _peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+class Profile:
+    """Stage records of one report run, in the order the stages finished."""
+
+    def __init__(self, report, **context):
+        self.report = report
+        self.context = context
+        self.stages = []
+        # Stages entered but not finished yet, outermost first, and the
+        # latest progress() report; both let another thread watch a run
+        self.running = []
+        self.progress = None
+        self._progress_depth = 0
+        self.seconds = None
+        self._peaks = []
+
+    def frame(self):
+        return pd.DataFrame(self.stages)
+
+    def to_record(self):
+        return {'run_at': datetime.now().isoformat(timespec='seconds'), 'report': self.report,
+                'seconds': self.seconds, **self.context, 'stages': self.stages}
+
+
+@contextmanager
+def profiled(report, log_path=STAGE_LOG, **context):
+    """Collect the stages run inside the block and append them to `log_path` as one JSON line."""
+    profile = Profile(report, **context)
+    token = _current.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.seconds = round(time.perf_counter() - start, 4)
+        _current.reset(token)
+        if log_path:
+            write_log(profile, log_path)
+
+
+def profiled_call(report, func, *args, **kwargs):
+    """`func(*args, **kwargs)` as its own profiled run, e.g. for a deferred download."""
+    with profiled(report):
+        return func(*args, **kwargs)
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Record wall time, rows and memory of the block under the active profile.
+
+    Yields a dict the block may update (e.g. with `rows`). Without an active
+    profile nothing is recorded. Peak RSS is the process high-water mark, so
+    its growth shows stages that raised it; the tracemalloc peak is only
+    recorded while tracemalloc is tracing (OSG_TRACEMALLOC=1).
+    """
+    profile = _current.get()
+    record = {'stage': name, 'rows': rows}
+    if profile is None:
+        yield record
+        return
+
+    traced = tracemalloc.is_tracing()
+    if traced:
+        # Fold the peak so far into the enclosing stage before resetting it for this one
+        current, peak = tracemalloc.get_traced_memory()
+        if profile._peaks:
+            profile._peaks[-1] = max(profile._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        profile._peaks.append(current)
+    rss_before = _peak_rss_mib()
+    profile.running.append(name)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 4)
+        profile.running.pop()
+        if profile._progress_depth > len(profile.running):
+            # The stage that reported it is over
+            profile.progress = None
+        rss_after = _peak_rss_mib()
+        if rss_after is not None:
+            record['peak_rss_mib'] = round(rss_after, 1)
+            record['peak_rss_growth_mib'] = round(rss_after - rss_before, 1)
+        if traced and tracemalloc.is_tracing():
+            peak = max(profile._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if profile._peaks:
+                profile._peaks[-1] = max(profile._peaks[-1], peak)
+            record['tracemalloc_peak_mib'] = round((peak - current) / 2**20, 1)
+        profile.stages.append(record)
+
+
+def progress(label, done, total=None):
+    """Report how far the running stage has got, e.g. progress('rows mapped', 5000, 20000).
+
+    Only the latest report is kept, on the active profile, until the stage
+    it was made in finishes; without a profile this does nothing.
+    """
+    profile = _current.get()
+    if profile is not None:
+        profile.progress = (label, done, total)
+        profile._progress_depth = len(profile.running)
+
+
+def instrumented(name):
+    """Decorator running the function as a stage; DataFrame results set the row count."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name) as record:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    record['rows'] = len(result)
+                elif isinstance(result, bytes):
+                    record['bytes'] = len(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def write_log(profile, log_path=STAGE_LOG):
+    # Diagnostics must never break a report
+    try:
+        os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+        line = json.dumps(profile.to_record(), default=str)
+        with _log_lock, open(log_path, 'a') as f:
+            f.write(line + '\n')
+    except Exception:
+        pass
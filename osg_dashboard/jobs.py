@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from osg_dashboard.instrumentation import profiled
+from osg_dashboard.result_cache import results
+
+# Report builds running at once across all sessions; further jobs queue
+MAX_WORKERS = int(os.environ.get("OSG_JOB_WORKERS", 2))
+# Unfinished jobs one session (owner) may have, so one user cannot occupy every worker
+MAX_JOBS_PER_OWNER = int(os.environ.get("OSG_JOBS_PER_SESSION", 1))
+# Finished jobs kept for sessions that reconnect; their results live in the result cache
+MAX_FINISHED = 32
+
+# Job._value of a result that is read back from the result cache
+_CACHED = object()
+
+
+class JobLimitError(RuntimeError):
+    pass
+
+
+class JobExpiredError(LookupError):
+    pass
+
+
+def job_id(key):
+    """Job ID of a cache-style key, the same in every session and process."""
+    return hashlib.blake2b(repr(key).encode(), digest_size=10).hexdigest()
+
+
+class Job:
+    """One report build submitted to a JobRunner.
+
+    `profile` is the instrumentation Profile of the run, set once a worker
+    picks the job up; its finished stages, running stage and latest progress
+    report are what the UI shows while waiting. The result goes into `cache`
+    under the job's key and is read back from there, so finished jobs do not
+    hold results outside the cache's size bound.
+    """
+
+    def __init__(self, key, report, owner, context, cache):
+        self.id = job_id(key)
+        self.key = key
+        self.report = report
+        self.owner = owner
+        self.context = context
+        self.cache = cache
+        self.profile = None
+        self.future = None
+        self._value = _CACHED
+
+    def _run(self, func, args):
+        with profiled(self.report, **self.context) as profile:
+            self.profile = profile
+            value = self.cache.get_or_compute(self.key, func, *args)
+        # A result too large for memory with no disk to spill to stays with the job
+        if self.key not in self.cache:
+            self._value = value
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def failed(self):
+        return self.done and self.future.exception() is not None
+
+    @property
+    def expired(self):
+        """Finished, but its result has since been pruned from the cache."""
+        return self.done and not self.failed and self._value is _CACHED and self.key not in self.cache
+
+    def result(self):
+        """The job's return value; re-raises what the job raised. Blocks until it is done."""
+        self.future.result()
+        if self._value is not _CACHED:
+            return self._value
+        value = self.cache.get(self.key)
+        if value is None:
+            raise JobExpiredError("This report is no longer cached; upload the files again to rebuild it.")
+        return value
+
+    def fraction(self):
+        """Share of the running stage's work done, when it reports progress with a total."""
+        progress = self.profile.progress if self.profile else None
+        if self.done:
+            return 1.0
+        if progress is None or not progress[2]:
+            return None
+        return min(progress[1] / progress[2], 1.0)
+
+    def describe(self):
+        """One line on where the job is, for a progress bar."""
+        if self.done:
+            return "Failed" if self.failed else "Done"
+        profile = self.profile
+        if profile is None:
+            return "Waiting for a free worker..."
+        running = profile.running[-1] if profile.running else "starting"
+        text = f"{running} ({len(profile.stages)} stages done)"
+        if profile.progress is not None:
+            label, done, total = profile.progress
+            text += f" - {done:,} of {total:,} {label}" if total else f" - {done:,} {label}"
+        return text
+
+
+class JobRunner:
+    """Bounded thread pool for report builds, with a process-wide registry of jobs by ID.
+
+    Submitting a key that is already queued, running or finished returns the
+    existing job, so sessions asking for the same report share one build and
+    a session that reconnects can pick up the result by job ID. Failed jobs,
+    and finished ones whose result has left `cache`, are replaced on the
+    next submit. A key already in `cache` finishes without running `func`.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_per_owner=MAX_JOBS_PER_OWNER, max_finished=MAX_FINISHED,
+                 cache=results):
+        self.max_per_owner = max_per_owner
+        self.max_finished = max_finished
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='osg-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, key):
+        """The queued, running or finished job for `key`; None if there is none or it failed or expired."""
+        job = self.get(job_id(key))
+        return None if job is None or job.failed or job.expired else job
+
+    def submit(self, key, report, func, *args, owner=None, **context):
+        """The job building `key` with `func(*args)`, started if there is none.
+
+        The run is profiled as `report` with `context`, like profiled().
+        Raises JobLimitError if `owner` already has max_per_owner unfinished
+        jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id(key))
+            if job is not None and not job.failed and not job.expired:
+                return job
+            if owner is not None:
+                active = sum(1 for other in self._jobs.values() if other.owner == owner and not other.done)
+                if active >= self.max_per_owner:
+                    raise JobLimitError("Another report you started is still running; wait for it to finish.")
+            job = Job(key, report, owner, context, self.cache)
+            job.future = self._pool.submit(job._run, func, args)
+            self._jobs.pop(job.id, None)
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def _prune(self):
+        finished = [job.id for job in self._jobs.values() if job.done]
+        for stale in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[stale]
+
+
+runner = JobRunner()
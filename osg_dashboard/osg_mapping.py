@@ -0,0 +1,466 @@
+import contextlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from osg_dashboard.excel_writer import XlsxStream, frame_to_xlsx
+from osg_dashboard.exports import HIGHLIGHT_COLUMN, csv_bytes, parquet_bytes
+from osg_dashboard.instrumentation import instrumented, progress, stage
+from osg_dashboard.sku_parser import category_families, extract_store_codes, parse_sku, parse_skus
+
+# Column layout of the mapped report
+FINAL_COLUMNS = [
+    'Customer Mobile', 'Date', 'Invoice Number','Product Invoice Number', 'Customer Name', 'Store Code', 'Branch', 'Region',
+    'IMEI', 'Category', 'Brand', 'Quantity', 'Item Code', 'Model', 'Plan Type', 'EWS QTY', 'Item Rate',
+    'Plan Price', 'Sold Price', 'Email', 'Product Count', 'Manufacturer Warranty', 'Retailer SKU', 'OnsiteGo SKU',
+    'Duration (Year)', 'Total Coverage', 'Comment', 'Return Flag', 'Return against invoice No.',
+    'Primary Invoice No.'
+]
+
+# Integer Customer Mobile key shared by the OSG and PRODUCT frames while mapping
+MOBILE_KEY = '_mobile'
+
+
+def _single_model(model_codes):
+    return len(model_codes) > 0 and len(set(model_codes)) == 1
+
+
+class ProductIndex:
+    """PRODUCT rows grouped by mobile key, built once per upload.
+
+    `product_df` must already be normalised the way tab3 does it (upper-cased
+    Category, filled Model, string Invoice Number, numeric Item Rate) and
+    carry MOBILE_KEY. Rows are held as one mobile-sorted position array plus
+    per-mobile bounds, and models as integer codes, so the index costs a few
+    bytes per row rather than Python objects per mobile.
+    """
+
+    def __init__(self, product_df):
+        keys = product_df[MOBILE_KEY].to_numpy()
+        self.order = np.argsort(keys, kind='stable')
+        self.mobiles, self.starts = np.unique(keys[self.order], return_index=True)
+        self.ends = np.append(self.starts[1:], len(keys))
+        codes, models = pd.factorize(product_df['Model'], use_na_sentinel=False)
+        self.model_code = codes
+        self.models = np.asarray(models, dtype=object)
+        codes, categories = pd.factorize(product_df['Category'], use_na_sentinel=False)
+        self.category_code = codes
+        self.category_families = [category_families(category) for category in categories]
+        self._family_masks = {}
+        self.item_rate = product_df['Item Rate'].to_numpy(dtype=float)
+        self.invoice_code, self.invoices = pd.factorize(product_df['Invoice Number'])
+
+    def rows_for(self, mobile):
+        """Positions of the mobile's PRODUCT rows in upload order; None when it has none."""
+        i = np.searchsorted(self.mobiles, mobile)
+        # -1 is a missing mobile, which never matches (as NaN did as a str key)
+        if mobile == -1 or i == len(self.mobiles) or self.mobiles[i] != mobile:
+            return None
+        return self.order[self.starts[i]:self.ends[i]]
+
+    def model_of(self, row):
+        return self.models[self.model_code[row]]
+
+    def invoice_codes(self, invoices):
+        """Codes of OSG invoice numbers among the PRODUCT ones; -1 for invoices not in PRODUCT."""
+        return self.invoices.get_indexer(invoices)
+
+    def family_mask(self, family):
+        """Boolean lookup over category codes: True where the category is covered by `family`."""
+        mask = self._family_masks.get(family)
+        if mask is None:
+            mask = np.array([family in families for families in self.category_families], dtype=bool)
+            self._family_masks[family] = mask
+        return mask
+
+    def match(self, mobile, retailer_sku, invoice_code):
+        """Resolve the Model for one OSG row: single model, category keywords, price slab, invoice.
+
+        `invoice_code` comes from invoice_codes().
+        """
+        rows = self.rows_for(mobile)
+        if rows is None:
+            return ''
+        if _single_model(self.model_code[rows]):
+            return self.model_of(rows[0])
+
+        sku = parse_sku(retailer_sku)
+        filtered = rows[self.family_mask(sku.category)[self.category_code[rows]]]
+        if _single_model(self.model_code[filtered]):
+            return self.model_of(filtered[0])
+
+        slab_min, slab_max = sku.slab_min, sku.slab_max
+        if slab_min and slab_max:
+            rates = self.item_rate[filtered]
+            slab_filtered = filtered[(rates >= slab_min) & (rates <= slab_max)]
+            if _single_model(self.model_code[slab_filtered]):
+                return self.model_of(slab_filtered[0])
+            if invoice_code < 0:
+                return ''
+            invoice_filtered = slab_filtered[self.invoice_code[slab_filtered] == invoice_code]
+            if _single_model(self.model_code[invoice_filtered]):
+                return self.model_of(invoice_filtered[0])
+
+        return ''
+
+
+# Distinct keys resolved between two progress reports
+PROGRESS_EVERY = 5000
+
+
+def map_models(osg_df, index, rows_before=None):
+    """Categorical Model for every OSG row, resolving each distinct (mobile, SKU, invoice) only once.
+
+    `rows_before` is given when `osg_df` is one chunk of a stream (see
+    ChunkMapper); progress then counts rows across chunks, without a total.
+    """
+    if 'Invoice Number' in osg_df.columns:
+        invoices = osg_df['Invoice Number'].map(str)
+    else:
+        invoices = pd.Series('', index=osg_df.index)
+    keys = pd.DataFrame({
+        'mobile': osg_df[MOBILE_KEY],
+        'sku': osg_df['Retailer SKU'].map(str),
+        'invoice': index.invoice_codes(invoices),
+    }, index=osg_df.index)
+    # ngroup numbers keys in order of first appearance, as drop_duplicates lists them
+    group = keys.groupby(list(keys.columns), sort=False, observed=True).ngroup().to_numpy()
+    distinct = list(keys.drop_duplicates().itertuples(index=False, name=None))
+    # OSG rows covered once the first n distinct keys are resolved, for progress reports
+    rows_done = np.cumsum(np.bincount(group, minlength=len(distinct)))
+    models = []
+    for start in range(0, len(distinct), PROGRESS_EVERY):
+        models += [index.match(*key) for key in distinct[start:start + PROGRESS_EVERY]]
+        if rows_before is None:
+            progress('rows mapped', int(rows_done[len(models) - 1]), len(osg_df))
+        else:
+            progress('rows mapped', rows_before + int(rows_done[len(models) - 1]))
+    resolved = pd.Categorical(models)
+    return pd.Series(pd.Categorical.from_codes(resolved.codes[group], resolved.categories), index=osg_df.index)
+
+
+# OSG column -> PRODUCT column handed out from each (mobile, Model) pool
+POOL_COLUMNS = {
+    'Product Invoice Number': 'Invoice Number',
+    'Item Rate': 'Item Rate',
+    'IMEI': 'IMEI',
+}
+
+
+def assign_from_pools(osg_df, product_df):
+    """Fill the POOL_COLUMNS on `osg_df` first-come-first-served, in one pass.
+
+    The n-th OSG row of a (mobile, Model) key takes the n-th PRODUCT row of
+    the same key; OSG rows beyond the end of the pool get ''.
+    """
+    keys = [MOBILE_KEY, 'Model']
+    pool = product_df[keys].copy()
+    pool['_rank'] = product_df.groupby(keys, sort=False, dropna=False).cumcount()
+    pool['_pos'] = np.arange(len(product_df))
+    wanted = osg_df[keys].copy()
+    wanted['_rank'] = osg_df.groupby(keys, sort=False, dropna=False).cumcount()
+    pos = wanted.merge(pool, on=keys + ['_rank'], how='left')['_pos'].to_numpy()
+
+    matched = ~np.isnan(pos)
+    taken = pos[matched].astype(np.intp)
+    for target, source in POOL_COLUMNS.items():
+        osg_df[target] = _pooled(product_df[source], matched, taken)
+    return osg_df
+
+
+def _pooled(source, matched, taken):
+    """`source` values at `taken` for matched rows and '' for the rest.
+
+    Text columns keep their (compact) string dtype; mixed columns such as Item
+    Rate, numbers plus '', become categoricals instead of Python objects.
+    """
+    values = source.take(taken).to_numpy(dtype=object)
+    if pd.api.types.is_string_dtype(source.dtype):
+        pooled = np.full(len(matched), '', dtype=object)
+        pooled[matched] = values
+        return pd.array(pooled, dtype=source.dtype)
+    codes, uniques = pd.factorize(values)
+    categories = uniques.tolist()
+    if '' in categories:
+        blank = categories.index('')
+    else:
+        blank = len(categories)
+        categories.append('')
+    pooled = np.full(len(matched), blank, dtype=np.intp)
+    pooled[matched] = codes
+    return pd.Categorical.from_codes(pooled, categories=pd.Index(categories, dtype=object))
+
+
+def _fill_blank(values):
+    """fillna('') that also works on categoricals, which need '' as a category first."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and '' not in values.cat.categories:
+        values = values.cat.add_categories('')
+    return values.fillna('')
+
+
+def _number_text(value):
+    if isinstance(value, (float, np.floating)) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def mobile_text(mobiles):
+    """Customer Mobile as text, whole numbers without a '.0'; missing mobiles stay missing.
+
+    A mobile column with blanks is read as floats, so 9876543210 and
+    9876543210.0 are the same mobile.
+    """
+    if pd.api.types.is_integer_dtype(mobiles.dtype):
+        return mobiles.astype(str)
+    if pd.api.types.is_float_dtype(mobiles.dtype):
+        text = mobiles.astype(str)
+        whole = (mobiles == np.floor(mobiles)) & np.isfinite(mobiles)
+        text[whole] = mobiles[whole].astype(np.int64).astype(str)
+        return text
+    codes, uniques = pd.factorize(mobiles)
+    canonical = pd.Series([_number_text(value) for value in uniques], dtype=str)
+    return pd.Series(canonical.reindex(codes).to_numpy(), index=mobiles.index, name=mobiles.name, dtype=str)
+
+
+def mobile_keys(osg_mobiles, product_mobiles):
+    """Integer keys for both Customer Mobile columns, equal exactly where their mobile_text() forms are.
+
+    Integer columns are used as they are; anything else is compared as text
+    through one shared factorization. Missing mobiles get -1.
+    """
+    if pd.api.types.is_integer_dtype(osg_mobiles.dtype) and pd.api.types.is_integer_dtype(product_mobiles.dtype):
+        return osg_mobiles.to_numpy(dtype=np.int64), product_mobiles.to_numpy(dtype=np.int64)
+    codes, _ = pd.factorize(pd.concat([mobile_text(osg_mobiles), mobile_text(product_mobiles)], ignore_index=True))
+    return codes[:len(osg_mobiles)], codes[len(osg_mobiles):]
+
+
+def normalize_product_df(product_df):
+    product_df['Category'] = product_df['Category'].str.upper().fillna('').astype('category')
+    product_df['Model'] = _fill_blank(product_df['Model'])
+    product_df['Invoice Number'] = product_df['Invoice Number'].astype(str)
+    product_df['Item Rate'] = pd.to_numeric(product_df['Item Rate'], errors='coerce')
+    product_df['IMEI'] = product_df['IMEI'].astype(str).fillna('')
+    product_df['Brand'] = _fill_blank(product_df['Brand'])
+    return product_df
+
+
+def map_osg(osg_df, product_df):
+    """Map PRODUCT details onto OSG rows and lay them out as FINAL_COLUMNS.
+
+    Both frames are normalised in place; pass copies if the caller still needs them.
+    """
+    with stage('normalize', rows=len(product_df)):
+        product_df = normalize_product_df(product_df)
+        osg_df[MOBILE_KEY], product_df[MOBILE_KEY] = mobile_keys(osg_df['Customer Mobile'], product_df['Customer Mobile'])
+        osg_df['Customer Mobile'] = mobile_text(osg_df['Customer Mobile'])
+
+    with stage('match_models', rows=len(osg_df)):
+        product_index = ProductIndex(product_df)
+        osg_df['Model'] = map_models(osg_df, product_index)
+    with stage('merge_category_brand', rows=len(osg_df)):
+        category_brand_df = product_df[[MOBILE_KEY, 'Model', 'Category', 'Brand']].drop_duplicates()
+        osg_df = osg_df.merge(category_brand_df, on=[MOBILE_KEY, 'Model'], how='left')
+
+    with stage('assign_from_pools', rows=len(osg_df)):
+        osg_df = assign_from_pools(osg_df, product_df)
+    with stage('parse_skus', rows=len(osg_df)):
+        osg_df = parse_osg_skus(osg_df)
+    return final_layout(osg_df)
+
+
+def parse_osg_skus(osg_df):
+    osg_df['Store Code'] = extract_store_codes(osg_df['Product Invoice Number']).astype('category')
+    parsed_skus = parse_skus(osg_df['Retailer SKU'])
+    osg_df['Manufacturer Warranty'] = parsed_skus['Manufacturer Warranty']
+    osg_df['Duration (Year)'] = parsed_skus['Duration (Year)'].astype('category')
+    return osg_df
+
+
+def final_layout(osg_df):
+    """`osg_df` as FINAL_COLUMNS, with blanks for the columns the uploads did not provide."""
+    # One shared category keeps the blank columns cheap
+    blank = pd.Categorical.from_codes(np.zeros(len(osg_df), dtype=np.int8), categories=[''])
+    for col in FINAL_COLUMNS:
+        if col not in osg_df.columns:
+            osg_df[col] = blank
+    osg_df['Quantity'] = np.ones(len(osg_df), dtype=np.int8)
+    osg_df['EWS QTY'] = np.ones(len(osg_df), dtype=np.int8)
+    return osg_df[FINAL_COLUMNS]
+
+
+# Mobile key of OSG rows whose mobile no PRODUCT row has (-1 is a missing mobile)
+NO_PRODUCT_MOBILE = -2
+
+
+class ChunkMapper:
+    """map_osg for an OSG upload that arrives in row chunks, e.g. from ingest.iter_upload_chunks.
+
+    Everything taken from PRODUCT is built once: the ProductIndex, the
+    Category/Brand of each (mobile, Model) and the PRODUCT rows of each
+    (mobile, Model) pool. map() then maps one chunk at a time, in file order,
+    handing out pooled rows across chunks exactly as assign_from_pools does
+    for a whole file, so memory holds the PRODUCT side plus one chunk.
+
+    Mobiles are compared by their mobile_text() forms, as mobile_keys does,
+    so a chunk whose mobiles are read as floats (it has blanks) matches like
+    one read as integers.
+    """
+
+    def __init__(self, product_df):
+        product_df = normalize_product_df(product_df)
+        codes, self.mobiles = pd.factorize(mobile_text(product_df['Customer Mobile']))
+        product_df[MOBILE_KEY] = codes
+        self.index = ProductIndex(product_df)
+        self.category_brand = product_df[[MOBILE_KEY, 'Model', 'Category', 'Brand']].drop_duplicates()
+        self.pooled = product_df[list(POOL_COLUMNS.values())].reset_index(drop=True)
+
+        # Pools: PRODUCT positions grouped by (mobile, Model) pair, each in upload order
+        model_code, models = pd.factorize(product_df['Model'])
+        self.models = pd.Index(np.asarray(models, dtype=object))
+        pair, pairs = pd.factorize(self._pair_keys(codes, model_code))
+        self.pairs = pd.Index(pairs)
+        self.pool_rows = np.argsort(pair, kind='stable')
+        self.pool_size = np.bincount(pair, minlength=len(self.pairs))
+        self.pool_start = np.cumsum(self.pool_size) - self.pool_size
+        # Pooled rows handed out to earlier chunks
+        self.taken = np.zeros(len(self.pairs), dtype=np.int64)
+        self.rows_mapped = 0
+
+    def _pair_keys(self, mobile_keys, model_codes):
+        return mobile_keys.astype(np.int64) * len(self.models) + model_codes
+
+    def _mobile_keys(self, mobiles):
+        text = mobile_text(mobiles)
+        keys = self.mobiles.get_indexer(text)
+        keys[(keys == -1) & text.notna().to_numpy()] = NO_PRODUCT_MOBILE
+        return keys, text
+
+    def _take_from_pools(self, osg_df):
+        """PRODUCT position handed to each row, -1 when its pool is empty or used up."""
+        model_code = self.models.get_indexer(osg_df['Model'])
+        pair = self.pairs.get_indexer(self._pair_keys(osg_df[MOBILE_KEY].to_numpy(), model_code))
+        pair[model_code == -1] = -1
+        pooled = pair >= 0
+        rank = pd.Series(pair).groupby(pair).cumcount().to_numpy(copy=True)
+        rank[pooled] += self.taken[pair[pooled]]
+        self.taken += np.bincount(pair[pooled], minlength=len(self.taken))
+        pooled[pooled] = rank[pooled] < self.pool_size[pair[pooled]]
+        positions = np.full(len(pair), -1, dtype=np.intp)
+        positions[pooled] = self.pool_rows[self.pool_start[pair[pooled]] + rank[pooled]]
+        return positions
+
+    def map(self, osg_df):
+        """The mapped FINAL_COLUMNS rows of the next OSG chunk; modifies `osg_df` in place."""
+        osg_df[MOBILE_KEY], osg_df['Customer Mobile'] = self._mobile_keys(osg_df['Customer Mobile'])
+        osg_df['Model'] = map_models(osg_df, self.index, rows_before=self.rows_mapped)
+        osg_df = osg_df.merge(self.category_brand, on=[MOBILE_KEY, 'Model'], how='left')
+
+        positions = self._take_from_pools(osg_df)
+        matched = positions >= 0
+        for target, source in POOL_COLUMNS.items():
+            osg_df[target] = _pooled(self.pooled[source], matched, positions[matched])
+        self.rows_mapped += len(osg_df)
+        return final_layout(parse_osg_skus(osg_df))
+
+
+def map_osg_chunks(osg_chunks, product_df):
+    """Mapped FINAL_COLUMNS frame for each OSG chunk, in order; see ChunkMapper."""
+    with stage('index_products', rows=len(product_df)):
+        mapper = ChunkMapper(product_df)
+    for chunk in osg_chunks:
+        yield mapper.map(chunk)
+
+
+def _blank(values):
+    return (values.isna() | (values.astype(str).str.strip() == '')).to_numpy()
+
+
+def _invalid_price(value):
+    try:
+        return float(value) < 0
+    except Exception:
+        return True
+
+
+def highlight_mask(df):
+    """True for rows missing Model or IMEI, or whose Plan Price is negative or not a number."""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in ('Model', 'IMEI'):
+        mask |= _blank(df[col]) if col in df.columns else True
+    if 'Plan Price' in df.columns:
+        prices = df['Plan Price']
+        if isinstance(prices.dtype, np.dtype) and prices.dtype.kind in 'biuf':
+            mask |= (prices < 0).to_numpy()
+        else:
+            distinct = pd.Index(prices.drop_duplicates())
+            invalid = np.array([_invalid_price(value) for value in distinct], dtype=bool)
+            mask |= invalid[distinct.get_indexer(prices)]
+    return mask
+
+
+def _highlight_style():
+    from openpyxl.styles import NamedStyle, PatternFill
+    from openpyxl.styles.borders import DEFAULT_BORDER
+    from openpyxl.styles.fonts import DEFAULT_FONT
+
+    return NamedStyle(name='Mapped Highlight', font=DEFAULT_FONT, border=DEFAULT_BORDER,
+                      fill=PatternFill(fill_type='solid', fgColor='ADD8E6'))
+
+
+@instrumented('write_excel')
+def mapped_report_excel(df):
+    """Mapped report workbook with highlighted rows filled light blue, streamed row by row."""
+    highlight = _highlight_style()
+    with stage('highlight_mask', rows=len(df)):
+        mask = highlight_mask(df)
+    return frame_to_xlsx(df, mask, [highlight])
+
+
+# Unstyled exports carry the highlight as a column of their own
+def with_highlight(df):
+    """`df` plus a HIGHLIGHT_COLUMN, True for the rows mapped_report_excel fills."""
+    return df.assign(**{HIGHLIGHT_COLUMN: highlight_mask(df)})
+
+
+def mapped_report_csv(df):
+    return csv_bytes(with_highlight(df))
+
+
+def mapped_report_parquet(df):
+    return parquet_bytes(with_highlight(df))
+
+
+# Mapped report writers by format (see exports.export_formats)
+MAPPED_REPORTS = {'xlsx': mapped_report_excel, 'csv': mapped_report_csv, 'parquet': mapped_report_parquet}
+
+# Formats write_mapped_report can stream chunk by chunk
+STREAMED_FORMATS = ['xlsx', 'csv']
+
+
+def write_mapped_report(chunks, out, fmt='xlsx'):
+    """Write mapped frames (e.g. from map_osg_chunks) to `out` as they arrive; returns the rows written.
+
+    `out` is a path or binary file. xlsx rows are highlighted as in
+    mapped_report_excel(); csv gets a HIGHLIGHT_COLUMN of True/False instead
+    and needs no more memory than one chunk.
+    """
+    if fmt not in STREAMED_FORMATS:
+        raise ValueError(f"Mapped reports cannot be streamed as {fmt}")
+    with stage('map_and_write') as record:
+        rows = 0
+        if fmt == 'xlsx':
+            highlight = _highlight_style()
+            stream = XlsxStream(out, [highlight])
+            for chunk in chunks:
+                stream.append(chunk, highlight_mask(chunk))
+                rows += len(chunk)
+            stream.close()
+        else:
+            with contextlib.ExitStack() as stack:
+                f = stack.enter_context(open(out, 'wb')) if isinstance(out, (str, os.PathLike)) else out
+                for i, chunk in enumerate(chunks):
+                    with_highlight(chunk).to_csv(f, header=i == 0, index=False, mode='wb')
+                    rows += len(chunk)
+        record['rows'] = rows
+        return rows
@@ -0,0 +1,33 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+_lock = threading.Lock()
+
+
+def shared_pool():
+    """Process pool shared by every session and report, created on first use.
+
+    Workers are spawned, so each one only imports the modules of the
+    functions it is given (upload reading, PDF rendering).
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def discard_pool(pool):
+    """Forget `pool` once it is broken, so the next shared_pool() call starts a fresh one.
+
+    A worker that died (e.g. killed for memory) breaks the whole pool. Only
+    `pool` itself is forgotten, in case another thread already replaced it.
+    """
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
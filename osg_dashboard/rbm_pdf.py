@@ -0,0 +1,121 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+
+from osg_dashboard.instrumentation import instrumented, progress
+from osg_dashboard.process_pool import discard_pool, shared_pool
+
+# reportlab is imported by the functions that render, so importing this module
+# (the app, the CLI, pool workers) does not load it until a PDF is requested.
+
+# reportlab.lib.units.mm, in points
+MM = 72 / 25.4
+
+PDF_COLUMNS = ['Store', 'BDM', 'FTD Count', 'FTD Amount', 'MTD Count', 'MTD Amount']
+COL_WIDTHS = [100*MM/2.54, 70*MM/2.54, 60*MM/2.54, 60*MM/2.54, 60*MM/2.54, 60*MM/2.54]
+
+
+@lru_cache(maxsize=None)
+def base_table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#003366')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+    ])
+
+
+def render_rbm_pdf(rbm, columns, totals, generated_on):
+    """One RBM report as PDF bytes.
+
+    `columns` maps each of PDF_COLUMNS to a plain list of values so the job can
+    be shipped to a worker process without pandas.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, rightMargin=20, leftMargin=20, topMargin=20, bottomMargin=20)
+    elements = [Paragraph(f"<b><font size=14>{rbm} Report</font></b>", styles['Title']),
+                Paragraph(f"Generated on: {generated_on}", styles['Normal']),
+                Spacer(1, 12)]
+    table_data = [list(PDF_COLUMNS)]
+    cell_styles = []
+
+    rows = zip(*(columns[col] for col in PDF_COLUMNS))
+    for row_idx, (store, bdm, ftd_count, ftd_amount, mtd_count, mtd_amount) in enumerate(rows, start=1):
+        table_data.append([store, bdm, int(ftd_count), int(ftd_amount), int(mtd_count), int(mtd_amount)])
+        if ftd_count == 0:
+            cell_styles.append(('TEXTCOLOR', (2, row_idx), (2, row_idx), colors.red))
+        if mtd_count == 0:
+            cell_styles.append(('TEXTCOLOR', (4, row_idx), (4, row_idx), colors.red))
+
+    total_row = ['TOTAL', '', totals['FTD Count'], totals['FTD Amount'], totals['MTD Count'], totals['MTD Amount']]
+    table_data.append(total_row)
+    total_row_idx = len(table_data) - 1
+    cell_styles.extend([
+        ('BACKGROUND', (0, total_row_idx), (-1, total_row_idx), colors.HexColor('#FFD966')),
+        ('FONTNAME', (0, total_row_idx), (-1, total_row_idx), 'Helvetica-Bold')
+    ])
+    table = Table(table_data, colWidths=COL_WIDTHS)
+    table.setStyle(TableStyle(base_table_style().getCommands() + cell_styles))
+    elements.append(table)
+    doc.build(elements)
+    return pdf_buffer.getvalue()
+
+
+def pdf_file_name(rbm):
+    return f"{rbm}_Report.pdf"
+
+
+def _pdf_job(partition, generated_on):
+    return partition.rbm, {col: partition.data[col].tolist() for col in PDF_COLUMNS}, partition.totals, generated_on
+
+
+@instrumented('render_pdf')
+def render_partition_pdf(partition):
+    """PDF bytes for a single RBM partition, rendered in this process."""
+    return render_rbm_pdf(*_pdf_job(partition, datetime.now().strftime('%d-%m-%Y')))
+
+
+def iter_rbm_pdfs(partitions, parallel=True):
+    """Yield (file name, PDF bytes) per RBM partition, in partition order.
+
+    Partitions are rendered in a process pool when there is more than one of
+    them and more than one core; otherwise in this process.
+    """
+    generated_on = datetime.now().strftime('%d-%m-%Y')
+    jobs = [_pdf_job(partition, generated_on) for partition in partitions]
+    done = 0
+    if parallel and len(jobs) > 1 and (os.cpu_count() or 1) > 1:
+        pool = shared_pool()
+        try:
+            for pdf in pool.map(render_rbm_pdf, *zip(*jobs)):
+                done += 1
+                progress('RBMs rendered', done, len(jobs))
+                yield pdf_file_name(jobs[done - 1][0]), pdf
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); render the rest here instead
+            discard_pool(pool)
+    for job in jobs[done:]:
+        pdf = render_rbm_pdf(*job)
+        done += 1
+        progress('RBMs rendered', done, len(jobs))
+        yield pdf_file_name(job[0]), pdf
+
+
+@instrumented('render_pdfs')
+def build_rbm_pdfs(partitions, parallel=True):
+    return list(iter_rbm_pdfs(partitions, parallel))
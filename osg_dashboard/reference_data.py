@@ -0,0 +1,59 @@
+import glob
+import os
+
+import pandas as pd
+
+DEFAULT_DATA_DIR = os.environ.get("OSG_DATA_DIR", "/workspaces/osg-dashboard-app/Dedault")
+STORE_LIST_FILE = os.path.join(DEFAULT_DATA_DIR, "myG All Store.xlsx")
+RBM_BDM_FILE = os.path.join(DEFAULT_DATA_DIR, "RBM,BDM,BRANCH.xlsx")
+FUTURE_STORE_FILE = os.path.join(DEFAULT_DATA_DIR, "Future Store List.xlsx")
+
+
+def reference_version(*paths):
+    """Version tag for a set of reference workbooks, changing whenever any of them is edited or replaced."""
+    stats = [(os.path.basename(path), os.stat(path)) for path in paths]
+    return '|'.join(f"{name}@{stat.st_mtime_ns}-{stat.st_size}" for name, stat in stats)
+
+
+def sidecar_path(path):
+    """Parquet copy of a reference workbook, kept next to it as a hidden file.
+
+    The name records the workbook's mtime and size, so replacing the xlsx
+    with any other file (even one copied with an older mtime) never matches
+    an existing sidecar.
+    """
+    directory, name = os.path.split(path)
+    stat = os.stat(path)
+    return os.path.join(directory, f".{name}.{stat.st_mtime_ns}-{stat.st_size}.parquet")
+
+
+def _read_sidecar(path):
+    try:
+        return pd.read_parquet(sidecar_path(path))
+    except Exception:
+        # Missing, stale, unreadable or no parquet engine installed: fall back to the xlsx
+        return None
+
+
+def _write_sidecar(df, path):
+    try:
+        sidecar = sidecar_path(path)
+        df.to_parquet(sidecar, index=False)
+        # Sidecars of earlier versions of the workbook are never read again
+        directory, name = os.path.split(path)
+        for old in glob.glob(os.path.join(glob.escape(directory), f".{glob.escape(name)}*.parquet")):
+            if old != sidecar:
+                os.remove(old)
+    except Exception:
+        # The sidecar only speeds up cold starts; a read-only directory or a
+        # missing parquet engine must never break loading the workbook itself.
+        pass
+
+
+def read_reference(path):
+    """Read a reference workbook, preferring its parquet sidecar when that is up to date."""
+    df = _read_sidecar(path)
+    if df is None:
+        df = pd.read_excel(path)
+        _write_sidecar(df, path)
+    return df
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+# Private to the user: the disk tier unpickles whatever it finds here
+CACHE_DIR = os.environ.get("OSG_RESULT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".osg-dashboard", "cache"))
+MAX_MEMORY_BYTES = 256 * 1024 * 1024
+MAX_DISK_BYTES = 1024 * 1024 * 1024
+
+
+def source_version():
+    """Digest of this package's source files; results pickled by other code are never loaded."""
+    digest = hashlib.blake2b(digest_size=10)
+    package = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package)):
+        if name.endswith('.py'):
+            with open(os.path.join(package, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def content_hash(file):
+    """Digest of an uploaded file's bytes, so identical uploads share cache entries."""
+    data = file.getvalue() if hasattr(file, 'getvalue') else file
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def files_hash(files):
+    """Digest of a set of uploaded files, independent of the order they were picked in."""
+    if len(files) == 1:
+        return content_hash(files[0])
+    return content_hash(''.join(sorted(content_hash(file) for file in files)).encode())
+
+
+class ResultCache:
+    """Two-tier LRU cache for computed report results.
+
+    The memory tier keeps the most recently used results up to
+    `max_memory_bytes` of their pickled size; a larger result is only kept on
+    disk. Every result is also pickled under `directory` (created private to
+    the user), which is pruned oldest-first to stay under `max_disk_bytes`, so
+    results survive restarts and memory evictions. Disk entries are keyed on
+    `version` too, by default a digest of the package sources, so after a
+    deploy that changes how reports are built the old results are not served.
+    Keys are tuples of strings; callers must treat returned values as
+    read-only because they are shared between sessions.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_memory_bytes=MAX_MEMORY_BYTES, max_disk_bytes=MAX_DISK_BYTES,
+                 version=None):
+        self.directory = directory
+        self.version = source_version() if version is None else version
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        digest = hashlib.blake2b(repr((self.version, key)).encode(), digest_size=20).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pkl")
+
+    def _remember(self, key, value, size):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key)[1]
+            if size > self.max_memory_bytes:
+                return
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                self._memory_bytes -= self._memory.popitem(last=False)[1][1]
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            value = pickle.loads(data)
+            os.utime(path)
+            return value, len(data)
+        except Exception:
+            return None, 0
+
+    def _store(self, key, value):
+        """Pickle `value` to disk; returns its pickled size."""
+        # The disk tier is an optimisation; a full or read-only disk must not fail the report
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_path, path)
+            self._prune()
+            return size
+        except Exception:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _prune(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Cached value for `key`; None when neither tier has it."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key][0]
+        value, size = self._load(key)
+        if value is not None:
+            self._remember(key, value, size)
+        return value
+
+    def get_or_compute(self, key, compute, *args, **kwargs):
+        """Cached `compute(*args, **kwargs)` for `key`, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute(*args, **kwargs)
+            self._remember(key, value, self._store(key, value))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+results = ResultCache()
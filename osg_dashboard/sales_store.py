@@ -0,0 +1,162 @@
+import os
+import sqlite3
+import warnings
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from osg_dashboard.date_windows import window_span
+from osg_dashboard.instrumentation import instrumented
+
+SALES_DB = os.environ.get("OSG_SALES_DB", os.path.join(os.path.expanduser("~"), ".osg-dashboard", "daily_sales.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sales (
+    day TEXT NOT NULL,
+    store TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    amount REAL NOT NULL,
+    UNIQUE (day, store)
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    digest TEXT PRIMARY KEY,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+# strftime format of the sales DATE column; inferred from the data when unset
+SALES_DATE_FORMAT = os.environ.get("OSG_SALES_DATE_FORMAT")
+
+DAILY_COLUMNS = ['Store', 'DATE', 'QUANTITY', 'AMOUNT']
+
+
+def parse_dates(dates, date_format=SALES_DATE_FORMAT):
+    """Day-first sales dates parsed to the day; unparseable ones become NaT.
+
+    An export repeats a few dozen dates over all its lines, so only the
+    distinct values are parsed, all with one format: `date_format` or the one
+    inferred from the first of them. Values written another way (a mixed
+    export) are parsed individually instead of being dropped.
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.dt.normalize()
+    codes, uniques = pd.factorize(dates)
+    uniques = pd.Series(uniques, dtype=object)
+    text = uniques[uniques.map(lambda value: isinstance(value, str))]
+    if date_format is None and len(text):
+        with warnings.catch_warnings():
+            # A year-first first value guesses a year-first format; that is intended
+            warnings.simplefilter('ignore', UserWarning)
+            date_format = guess_datetime_format(text.iloc[0], dayfirst=True)
+    parsed = pd.to_datetime(uniques, format=date_format, dayfirst=True, errors='coerce')
+    unparsed = parsed.isna() & uniques.notna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(uniques[unparsed], format='mixed', dayfirst=True, errors='coerce')
+    # Missing dates have code -1, which takes the trailing NaT
+    values = np.append(parsed.dt.normalize().to_numpy(), np.datetime64('NaT'))
+    return pd.Series(values[codes], index=dates.index, name=dates.name)
+
+
+def sales_days(book1_df):
+    """Sales rows with Branch renamed to Store and DATE parsed to the day; unparseable dates are dropped."""
+    sales = book1_df.rename(columns={'Branch': 'Store'})
+    sales['DATE'] = parse_dates(sales['DATE'])
+    return sales.dropna(subset=['DATE'])
+
+
+def daily_totals(sales):
+    """QUANTITY and AMOUNT per store and day, stores in order of first appearance."""
+    return sales.groupby(['Store', 'DATE'], as_index=False, sort=False)[['QUANTITY', 'AMOUNT']].sum()
+
+
+class DailySalesStore:
+    """Per-store, per-day sales totals kept in SQLite across uploads.
+
+    An upload is authoritative for the (day, store) pairs it contains: their
+    totals replace what is stored, so the next morning's file completes a
+    partial FTD and a corrected file corrects earlier days. Other pairs are
+    left as they are, so one file per region can be uploaded on its own.
+    Uploads are remembered by content hash, so re-uploading a file changes
+    nothing. The revision
+    (SQLite's user_version) is bumped on every write and can key cached reports.
+    """
+
+    def __init__(self, path=SALES_DB):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def revision(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @instrumented('sales_store.ingest')
+    def ingest(self, book1_df, digest=None):
+        """Store the daily totals of `book1_df`; returns the days written.
+
+        The totals of each (day, store) in the upload replace the stored
+        ones. `book1_df` may be a callable returning the frame, so a file
+        already ingested under `digest` is never read.
+        """
+        conn = self._connect()
+        try:
+            # Checking the digest and writing are one transaction, so
+            # concurrent uploads of the same file write it once.
+            conn.execute("BEGIN IMMEDIATE")
+            if digest is not None and conn.execute("SELECT 1 FROM uploads WHERE digest = ?", (digest,)).fetchone():
+                conn.execute("COMMIT")
+                return []
+            daily = daily_totals(sales_days(book1_df() if callable(book1_df) else book1_df))
+            days = daily['DATE'].dt.strftime('%Y-%m-%d')
+            stores = daily['Store'].astype(str)
+            written = sorted(set(days))
+
+            conn.executemany("DELETE FROM daily_sales WHERE day = ? AND store = ?", zip(days, stores))
+            conn.executemany(
+                "INSERT INTO daily_sales (day, store, quantity, amount) VALUES (?, ?, ?, ?)",
+                zip(days, stores, daily['QUANTITY'].astype(float), daily['AMOUNT'].astype(float))
+            )
+            if digest is not None:
+                conn.execute("INSERT OR REPLACE INTO uploads (digest, ingested_at) VALUES (?, ?)",
+                             (digest, datetime.now().isoformat(timespec='seconds')))
+            if written:
+                revision = conn.execute("PRAGMA user_version").fetchone()[0]
+                conn.execute(f"PRAGMA user_version = {revision + 1}")
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return written
+
+    def report_daily(self, report_date, extra_windows=()):
+        """Daily totals for the month of `report_date` and any days `extra_windows` reach outside it."""
+        month_start = pd.Timestamp(report_date).replace(day=1)
+        month_end = month_start + pd.offsets.MonthEnd(0)
+        if not extra_windows:
+            return self.daily_between(month_start, month_end)
+        start, end = window_span(extra_windows)
+        return self.daily_between(min(start, month_start), max(end, month_end))
+
+    def daily_between(self, start, end):
+        """Daily totals for the days from `start` to `end` inclusive, as daily_totals() returns them."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT store, day, quantity, amount FROM daily_sales WHERE day BETWEEN ? AND ? ORDER BY rowid",
+                (pd.Timestamp(start).strftime('%Y-%m-%d'), pd.Timestamp(end).strftime('%Y-%m-%d'))
+            ).fetchall()
+        daily = pd.DataFrame(rows, columns=DAILY_COLUMNS)
+        daily['DATE'] = pd.to_datetime(daily['DATE'], format='%Y-%m-%d')
+        return daily
+
+
+sales_store = DailySalesStore()
@@ -0,0 +1,131 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import pandas as pd
+
+# SKU Mapping
+SKU_CATEGORY_MAPPING = {
+    "Warranty : Water Cooler/Dispencer/Geyser/RoomCooler/Heater": [
+        "COOLER", "DISPENCER", "GEYSER", "ROOM COOLER", "HEATER", "WATER HEATER", "WATER DISPENSER"
+    ],
+    "Warranty : Fan/Mixr/IrnBox/Kettle/OTG/Grmr/Geysr/Steamr/Inductn": [
+        "FAN", "MIXER", "IRON BOX", "KETTLE", "OTG", "GROOMING KIT", "GEYSER", "STEAMER", "INDUCTION",
+        "CEILING FAN", "TOWER FAN", "PEDESTAL FAN", "INDUCTION COOKER", "ELECTRIC KETTLE", "WALL FAN", "MIXER GRINDER", "CELLING FAN"
+    ],
+    "AC : EWP : Warranty : AC": ["AC", "AIR CONDITIONER", "AC INDOOR"],
+    "HAEW : Warranty : Air Purifier/WaterPurifier": ["AIR PURIFIER", "WATER PURIFIER"],
+    "HAEW : Warranty : Dryer/MW/DishW": ["DRYER", "MICROWAVE OVEN", "DISH WASHER", "MICROWAVE OVEN-CONV"],
+    "HAEW : Warranty : Ref/WM": [
+        "REFRIGERATOR", "WASHING MACHINE", "WASHING MACHINE-TL", "REFRIGERATOR-DC",
+        "WASHING MACHINE-FL", "WASHING MACHINE-SA", "REF", "REFRIGERATOR-CBU", "REFRIGERATOR-FF", "WM"
+    ],
+    "HAEW : Warranty : TV": ["TV", "TV 28 %", "TV 18 %"],
+    "TV : TTC : Warranty and Protection : TV": ["TV", "TV 28 %", "TV 18 %"],
+    "TV : Spill and Drop Protection": ["TV", "TV 28 %", "TV 18 %"],
+    "HAEW : Warranty :Chop/Blend/Toast/Air Fryer/Food Processr/JMG/Induction": [
+        "CHOPPER", "BLENDER", "TOASTER", "AIR FRYER", "FOOD PROCESSOR", "JUICER", "INDUCTION COOKER"
+    ],
+    "HAEW : Warranty : HOB and Chimney": ["HOB", "CHIMNEY"],
+    "HAEW : Warranty : HT/SoundBar/AudioSystems/PortableSpkr": [
+        "HOME THEATRE", "AUDIO SYSTEM", "SPEAKER", "SOUND BAR", "PARTY SPEAKER"
+    ],
+    "HAEW : Warranty : Vacuum Cleaner/Fans/Groom&HairCare/Massager/Iron": [
+        "VACUUM CLEANER", "FAN", "MASSAGER", "IRON BOX", "CEILING FAN", "TOWER FAN", "PEDESTAL FAN", "WALL FAN", "ROBO VACCUM CLEANER"
+    ],
+    "AC AMC": ["AC", "AC INDOOR"]
+}
+
+# Plan family -> lower-cased product categories it covers, and the reverse
+FAMILY_CATEGORIES = {
+    sku_key: frozenset(kw.lower() for kw in keywords) for sku_key, keywords in SKU_CATEGORY_MAPPING.items()
+}
+CATEGORY_FAMILIES = {}
+for _family, _categories in FAMILY_CATEGORIES.items():
+    for _category in _categories:
+        CATEGORY_FAMILIES[_category] = CATEGORY_FAMILIES.get(_category, frozenset()) | {_family}
+
+SLAB_PATTERN = re.compile(r"Slab\s*:\s*(\d+)K-(\d+)K")
+DURATION_PATTERN = re.compile(r'Dur\s*:\s*(\d+)\+(\d+)')
+SDP_PATTERN = re.compile(r'(\d+)\+(\d+)\s*SDP-(\d+)')
+DURATION_ONLY_PATTERN = re.compile(r'Dur\s*:\s*(\d+)')
+PLUS_PATTERN = re.compile(r'(\d+)\+(\d+)')
+STORE_CODE_PATTERN = re.compile(r'\b([A-Z]{2,})\b')
+
+ParsedSku = namedtuple('ParsedSku', ['slab_min', 'slab_max', 'manufacturer_warranty', 'duration', 'category'])
+
+# Column names of the table returned by parse_skus, in ParsedSku field order
+SKU_TABLE_COLUMNS = ['Slab Min', 'Slab Max', 'Manufacturer Warranty', 'Duration (Year)', 'SKU Category']
+
+
+def extract_price_slab(text):
+    match = SLAB_PATTERN.search(str(text))
+    if match:
+        return int(match.group(1)) * 1000, int(match.group(2)) * 1000
+    return None, None
+
+
+def extract_warranty_duration(sku):
+    sku = str(sku)
+    match = DURATION_PATTERN.search(sku)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = SDP_PATTERN.search(sku)
+    if match:
+        return int(match.group(1)), f"{match.group(3)}P+{match.group(2)}W"
+    match = DURATION_ONLY_PATTERN.search(sku)
+    if match:
+        return 1, int(match.group(1))
+    match = PLUS_PATTERN.search(sku)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return '', ''
+
+
+def category_families(category):
+    """Plan families a PRODUCT Category belongs to, matched case-insensitively."""
+    return CATEGORY_FAMILIES.get(str(category).lower(), frozenset())
+
+
+def sku_category(retailer_sku):
+    """First SKU_CATEGORY_MAPPING key contained in the SKU, or '' when none is."""
+    for sku_key in SKU_CATEGORY_MAPPING:
+        if sku_key in retailer_sku:
+            return sku_key
+    return ''
+
+
+@lru_cache(maxsize=4096)
+def parse_sku(retailer_sku):
+    """Parse one Retailer SKU string; cached for the life of the process."""
+    slab_min, slab_max = extract_price_slab(retailer_sku)
+    warranty, duration = extract_warranty_duration(retailer_sku)
+    return ParsedSku(slab_min, slab_max, warranty, duration, sku_category(retailer_sku))
+
+
+def parse_skus(skus):
+    """Parse a column of Retailer SKUs, one parse per distinct value.
+
+    Returns a frame with SKU_TABLE_COLUMNS aligned to `skus`. Slab bounds are
+    nullable integers; warranty and duration keep the mixed int/str values
+    the mapped report has always shown.
+    """
+    distinct = pd.Index(skus.drop_duplicates())
+    table = pd.DataFrame([parse_sku(str(sku)) for sku in distinct], columns=SKU_TABLE_COLUMNS)
+    table['Slab Min'] = table['Slab Min'].astype('Int64')
+    table['Slab Max'] = table['Slab Max'].astype('Int64')
+
+    parsed = table.take(distinct.get_indexer(skus))
+    parsed.index = skus.index
+    return parsed
+
+
+def extract_store_codes(invoice_numbers):
+    """Store Code for each invoice number, matching each distinct invoice once."""
+    # Blank invoices (e.g. unmatched rows, or a PRODUCT row without one) stay NaN under astype(str)
+    invoice_numbers = invoice_numbers.astype(str).fillna('')
+    codes = {}
+    for invoice in invoice_numbers.drop_duplicates():
+        match = STORE_CODE_PATTERN.search(invoice)
+        codes[invoice] = match.group(1) if match else ''
+    return pd.Series([codes[invoice] for invoice in invoice_numbers], index=invoice_numbers.index)
@@ -0,0 +1,76 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+HIERARCHY_COLUMNS = ['RBM', 'BDM']
+
+
+def store_key(names):
+    """Join key of store names: trimmed, inner whitespace collapsed and upper case; missing names stay NaN."""
+    names = pd.Series(names, dtype=object)
+    text = names[names.notna()].astype(str).str.strip().str.replace(r'\s+', ' ', regex=True).str.upper()
+    return text.reindex(names.index).replace('', np.nan)
+
+
+class StoreDimension:
+    """Stores with stable integer IDs and their RBM/BDM hierarchy.
+
+    IDs 0..listed-1 are the stores of the store list, in list order; stores
+    only in the RBM/BDM table follow. Names from any source resolve to an ID
+    through store_key(), so "Store 01 " and "STORE 01" are one store, shown
+    under the first spelling seen. `table` is indexed by store ID.
+    """
+
+    def __init__(self, store_names, rbm_bdm_df=None):
+        names = pd.Series(store_names, dtype=object).dropna()
+        hierarchy = pd.DataFrame(columns=['Branch'] + HIERARCHY_COLUMNS)
+        if rbm_bdm_df is not None:
+            hierarchy = rbm_bdm_df[['Branch'] + HIERARCHY_COLUMNS].dropna(subset=['Branch'])
+        self.listed = store_key(names).dropna().nunique()
+
+        all_names = pd.concat([names, hierarchy['Branch']], ignore_index=True)
+        keys = store_key(all_names)
+        first = keys.notna() & ~keys.duplicated()
+        table = pd.DataFrame({'Store': all_names[first].to_numpy(), 'key': keys[first].to_numpy()})
+
+        # A branch listed twice in the RBM/BDM table keeps its first RBM/BDM
+        hierarchy_keys = store_key(hierarchy['Branch'])
+        unique_branch = (hierarchy_keys.notna() & ~hierarchy_keys.duplicated()).to_numpy()
+        by_key = hierarchy[unique_branch].set_index(hierarchy_keys[unique_branch].to_numpy())
+        for col in HIERARCHY_COLUMNS:
+            table[col] = table['key'].map(by_key[col])
+        self._set_table(table)
+
+    def _set_table(self, table):
+        self.table = table
+        self._keys = pd.Index(table['key'])
+
+    def __len__(self):
+        return len(self.table)
+
+    def ids(self, names):
+        """Store ID of each name, -1 for names that are missing or not in the dimension.
+
+        Only the distinct spellings are normalized, so mapping a sales column
+        costs one lookup per store rather than per row.
+        """
+        codes, spellings = pd.factorize(pd.Series(names))
+        spelling_ids = self._keys.get_indexer(store_key(spellings))
+        return np.append(spelling_ids, -1)[codes]
+
+    def extended(self, names):
+        """This dimension plus the stores of `names` it does not know, in order of first appearance.
+
+        Uploaded sales can name stores no reference workbook lists yet; they
+        get IDs after the reference stores (and no RBM/BDM).
+        """
+        spellings = pd.Series(pd.unique(pd.Series(names, dtype=object)), dtype=object)
+        keys = store_key(spellings)
+        new = keys.notna() & ~keys.duplicated() & (self._keys.get_indexer(keys) == -1)
+        if not new.any():
+            return self
+        extra = pd.DataFrame({'Store': spellings[new].to_numpy(), 'key': keys[new].to_numpy()})
+        dimension = copy.copy(self)
+        dimension._set_table(pd.concat([self.table, extra], ignore_index=True))
+        return dimension
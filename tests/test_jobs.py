@@ -0,0 +1,37 @@
+import os
+
+from osg_dashboard import jobs
+from osg_dashboard.jobs import JobRunner
+from osg_dashboard.result_cache import ResultCache
+
+
+def test_finished_job_reads_its_result_back_from_the_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_memory_bytes=0)
+    runner = JobRunner(max_workers=1, cache=cache)
+    job = runner.submit(('report',), 'report', bytes, 1000)
+
+    assert job.result() == bytes(1000)
+    assert job._value is jobs._CACHED
+    assert runner.find(('report',)) is job
+
+
+def test_job_whose_result_left_the_cache_is_replaced(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_memory_bytes=0)
+    runner = JobRunner(max_workers=1, cache=cache)
+    job = runner.submit(('report',), 'report', bytes, 1000)
+    job.future.result()
+    os.remove(cache._path(('report',)))
+
+    assert job.expired
+    assert runner.find(('report',)) is None
+    rebuilt = runner.submit(('report',), 'report', bytes, 1000)
+    assert rebuilt is not job and rebuilt.result() == bytes(1000)
+
+
+def test_result_the_cache_cannot_hold_stays_with_the_job(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_memory_bytes=0, max_disk_bytes=0)
+    runner = JobRunner(max_workers=1, cache=cache)
+    job = runner.submit(('report',), 'report', bytes, 1000)
+
+    assert job.result() == bytes(1000)
+    assert runner.find(('report',)) is job
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from osg_dashboard.osg_mapping import map_osg, map_osg_chunks
+
+
+def osg(mobiles, invoices):
+    return pd.DataFrame({
+        'Customer Mobile': mobiles,
+        'Retailer SKU': ["HAEW : Warranty : Ref/WM Slab : 10K-20K Dur : 1+2"] * len(mobiles),
+        'Invoice Number': invoices,
+        'Plan Price': [999] * len(mobiles),
+        'Customer Name': [f"C{i}" for i in range(len(mobiles))],
+        'Date': pd.Timestamp('2025-05-01'),
+    })
+
+
+def product(mobiles, models, invoices):
+    return pd.DataFrame({
+        'Customer Mobile': mobiles,
+        'Model': models,
+        'Category': ['REFRIGERATOR'] * len(mobiles),
+        'Invoice Number': invoices,
+        'Item Rate': [15000] * len(mobiles),
+        'IMEI': [f"35{i:013d}" for i in range(len(mobiles))],
+        'Brand': ['LG'] * len(mobiles),
+    })
+
+
+def test_product_row_without_invoice_number():
+    mapped = map_osg(osg([9000000001, 9000000002], ['INV KOC 1', 'INV KOC 2']),
+                     product([9000000001, 9000000002], ['M1', 'M2'], ['KOC/0001', np.nan]))
+
+    assert mapped['Model'].tolist() == ['M1', 'M2']
+    assert mapped['Store Code'].tolist() == ['KOC', '']
+
+
+def sample_uploads(rows=300, seed=0):
+    """OSG and PRODUCT frames sharing mobiles, with pooled models and a few unmatched mobiles."""
+    rng = np.random.default_rng(seed)
+    mobiles = 9_000_000_000 + rng.integers(0, rows // 3, rows * 2)
+    # Most mobiles bought one model; the rest need the SKU to pick one
+    models = np.where(rng.random(len(mobiles)) < 0.8, mobiles % 3, rng.integers(0, 4, len(mobiles)))
+    prod = product(mobiles, [f"M{i}" for i in models],
+                   [f"INV KOC {i}" for i in rng.integers(0, 50, len(mobiles))])
+    sold = np.where(rng.random(rows) < 0.9, mobiles[rng.integers(0, len(mobiles), rows)], 8_000_000_000 + np.arange(rows))
+    return osg(sold, [f"INV KOC {i}" for i in rng.integers(0, 50, rows)]), prod
+
+
+def with_blank_mobile(df, row):
+    """`df` as read from a file with no Customer Mobile on `row`: the column turns float."""
+    df = df.copy()
+    df['Customer Mobile'] = df['Customer Mobile'].astype(float)
+    df.loc[row, 'Customer Mobile'] = np.nan
+    return df
+
+
+def chunks_as_read(df, rows):
+    """`df` in chunks typed on their own, like ingest.iter_upload_chunks: a chunk without blanks is int."""
+    for start in range(0, len(df), rows):
+        chunk = df.iloc[start:start + rows].reset_index(drop=True)
+        if chunk['Customer Mobile'].notna().all():
+            chunk['Customer Mobile'] = chunk['Customer Mobile'].astype(np.int64)
+        yield chunk
+
+
+@pytest.mark.parametrize('osg_blank, product_blank', [(False, False), (True, False), (False, True), (True, True)])
+def test_chunked_mapping_matches_whole_file(osg_blank, product_blank):
+    osg_df, product_df = sample_uploads()
+    if osg_blank:
+        osg_df = with_blank_mobile(osg_df, len(osg_df) - 1)
+    if product_blank:
+        product_df = with_blank_mobile(product_df, len(product_df) - 1)
+
+    whole = map_osg(osg_df.copy(), product_df.copy())
+    chunked = pd.concat(map_osg_chunks(chunks_as_read(osg_df, 70), product_df.copy()), ignore_index=True)
+
+    assert (whole['Model'] != '').sum() > len(whole) // 4
+    assert chunked.to_csv(index=False) == whole.to_csv(index=False)
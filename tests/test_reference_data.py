@@ -0,0 +1,28 @@
+import os
+
+import pandas as pd
+import pytest
+
+from osg_dashboard.reference_data import read_reference, sidecar_path
+
+
+def write_store_list(path, stores, mtime):
+    pd.DataFrame({'Store': stores}).to_excel(path, index=False)
+    os.utime(path, (mtime, mtime))
+
+
+pytest.importorskip('pyarrow')
+
+
+def test_replaced_workbook_with_older_mtime_is_read_again(tmp_path):
+    path = str(tmp_path / 'stores.xlsx')
+    write_store_list(path, ['A', 'B'], mtime=1_700_000_000)
+    assert read_reference(path)['Store'].tolist() == ['A', 'B']
+    assert os.path.exists(sidecar_path(path))
+
+    # Copied over with its original, older mtime (cp -p, rsync -t)
+    write_store_list(path, ['A', 'B', 'Cochin'], mtime=1_600_000_000)
+
+    assert read_reference(path)['Store'].tolist() == ['A', 'B', 'Cochin']
+    sidecars = [name for name in os.listdir(tmp_path) if name.endswith('.parquet')]
+    assert sidecars == [os.path.basename(sidecar_path(path))]
@@ -0,0 +1,31 @@
+import os
+import stat
+
+from osg_dashboard.result_cache import ResultCache
+
+
+def test_memory_tier_is_bounded_by_pickled_size(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_memory_bytes=3000)
+    for i in range(5):
+        cache.get_or_compute(('payload', str(i)), bytes, 1000)
+    cache.get_or_compute(('too big',), bytes, 10_000)
+
+    assert list(cache._memory) == [('payload', '3'), ('payload', '4')]
+    assert cache._memory_bytes <= 3000
+    # Evicted and oversized results are still served from disk
+    assert cache.get_or_compute(('too big',), bytes, 1) == bytes(10_000)
+
+
+def test_disk_tier_is_private(tmp_path):
+    directory = tmp_path / 'cache'
+    ResultCache(str(directory)).get_or_compute(('key',), dict)
+
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+
+def test_disk_entries_of_other_code_versions_are_not_loaded(tmp_path):
+    directory = str(tmp_path / 'cache')
+    ResultCache(directory, version='old').get_or_compute(('report',), str, 'old output')
+
+    assert ResultCache(directory, version='old').get_or_compute(('report',), str, 'recomputed') == 'old output'
+    assert ResultCache(directory, version='new').get_or_compute(('report',), str, 'recomputed') == 'recomputed'
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from osg_dashboard.sales_store import DailySalesStore
+
+
+def sales(*lines):
+    """Sales lines of (store, day of October 2024, quantity) as a Full Month file reads them."""
+    return pd.DataFrame({
+        'Branch': [store for store, _, _ in lines],
+        'DATE': [f"{day:02d}-10-2024" for _, day, _ in lines],
+        'QUANTITY': [qty for _, _, qty in lines],
+        'AMOUNT': [qty * 100.0 for _, _, qty in lines],
+    })
+
+
+def stored(store):
+    daily = store.daily_between('2024-10-01', '2024-10-31')
+    return {(row.Store, row.DATE.day): row.QUANTITY for row in daily.itertuples()}
+
+
+def test_next_upload_completes_previous_partial_day(tmp_path):
+    store = DailySalesStore(str(tmp_path / 'sales.sqlite'))
+    store.ingest(sales(('A', 1, 5), ('A', 2, 5), ('A', 3, 1)), digest='morning-3')
+    written = store.ingest(sales(('A', 1, 5), ('A', 2, 5), ('A', 3, 5), ('A', 4, 5)), digest='morning-4')
+
+    assert written == ['2024-10-01', '2024-10-02', '2024-10-03', '2024-10-04']
+    assert stored(store) == {('A', 1): 5, ('A', 2): 5, ('A', 3): 5, ('A', 4): 5}
+
+
+def test_corrected_file_replaces_earlier_days(tmp_path):
+    store = DailySalesStore(str(tmp_path / 'sales.sqlite'))
+    store.ingest(sales(('A', 1, 5), ('A', 2, 5), ('A', 3, 5)), digest='original')
+    store.ingest(sales(('A', 1, 3), ('A', 2, 5), ('A', 3, 5)), digest='corrected')
+
+    assert stored(store) == {('A', 1): 3, ('A', 2): 5, ('A', 3): 5}
+
+
+def test_region_uploads_keep_each_others_stores(tmp_path):
+    store = DailySalesStore(str(tmp_path / 'sales.sqlite'))
+    store.ingest(sales(('A', 1, 1), ('A', 2, 2), ('A', 3, 3)), digest='region-a')
+    store.ingest(sales(('B', 1, 4), ('B', 2, 5), ('B', 3, 6)), digest='region-b')
+
+    assert stored(store) == {
+        ('A', 1): 1, ('A', 2): 2, ('A', 3): 3,
+        ('B', 1): 4, ('B', 2): 5, ('B', 3): 6,
+    }
+
+
+def test_same_file_is_ingested_once(tmp_path):
+    store = DailySalesStore(str(tmp_path / 'sales.sqlite'))
+    store.ingest(sales(('A', 1, 2)), digest='same')
+    revision = store.revision()
+
+    assert store.ingest(lambda: sales(('A', 1, 9)), digest='same') == []
+    assert store.revision() == revision
+    assert stored(store) == {('A', 1): 2}